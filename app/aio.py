@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import io
+import sys
+from array import array
+from typing import Any
+
+from app.governor import GovernedInterpreter, Limits, ResourceLimitError, LIMIT_EXIT_CODE
+from app.interpreter import EvaluationError
+from app.optimizer import Optimizer
+from app.output import MemorySink
+from app.parallel_scan import split_points
+from app.parser import Parser, ParseError
+from app.resolver import Resolver, ResolveError
+from app.scanner import TokenArray, scan_arrays
+
+
+# work items a run executes before it yields to the event loop
+SLICE_STEPS = 1000
+# characters scanned, and top-level statements parsed or resolved, per turn
+# while a program is being compiled
+SCAN_CHUNK = 1 << 14
+COMPILE_SLICE = 64
+
+
+class AsyncOutputSink:
+    """Asynchronous destination for a run's output.
+
+    A run hands over what it printed once per slice, so a slow consumer
+    holds back only the run writing to it.
+    """
+
+    async def write_lines(self, lines: list[str]) -> None:
+        raise NotImplementedError
+
+    async def write_error(self, text: str) -> None:
+        pass
+
+
+class AsyncMemorySink(AsyncOutputSink):
+    """Collects output and error text in memory, for embedding and tests."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.errors: list[str] = []
+
+    async def write_lines(self, lines: list[str]) -> None:
+        self.lines.extend(lines)
+
+    async def write_error(self, text: str) -> None:
+        self.errors.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+
+class StreamWriterSink(AsyncOutputSink):
+    """Writes output to an `asyncio.StreamWriter`, waiting for it to drain."""
+
+    def __init__(self, writer: asyncio.StreamWriter, errors: asyncio.StreamWriter = None):
+        self.writer = writer
+        self.errors = errors
+
+    async def write_lines(self, lines: list[str]) -> None:
+        self.writer.write("".join(line + "\n" for line in lines).encode())
+        await self.writer.drain()
+
+    async def write_error(self, text: str) -> None:
+        if self.errors is not None:
+            self.errors.write(text.encode())
+            await self.errors.drain()
+
+
+class CompileFailed(Exception):
+    def __init__(self, exit_code: int):
+        self.exit_code = exit_code
+
+
+async def compile_async(source: str, options: dict[str, Any], stderr: io.StringIO):
+    """Scan, parse, optimize and resolve like `run`, yielding between chunks.
+
+    Scanning goes through chunks cut at safe newlines (see `split_points`);
+    parsing, then optimizing, then resolving go `COMPILE_SLICE` top-level
+    statements at a time. Errors are written to `stderr` in the order `run`
+    reports them. The redirect of `sys.stderr` is process-wide, so it is
+    only in place between awaits, while no other task can run.
+
+    Returns the statements and whether the scanner reported errors; raises
+    `CompileFailed` with the exit code if the program cannot run.
+    """
+    types, starts, ends, errors = array("B"), array("I"), array("I"), []
+    cuts = split_points(source, len(source) // SCAN_CHUNK or 1)
+    bounds = [0, *cuts, len(source)]
+    for start, end in zip(bounds, bounds[1:]):
+        part = scan_arrays(source[start:end], start)
+        types.extend(part[0])
+        starts.extend(part[1])
+        ends.extend(part[2])
+        errors.extend(part[3])
+        await asyncio.sleep(0)
+    with contextlib.redirect_stderr(stderr):
+        tokens = TokenArray(source, 1, (types, starts, ends, errors))
+
+    parser = Parser(tokens)
+    stmts = []
+    while not parser.is_at_end():
+        with contextlib.redirect_stderr(stderr):
+            try:
+                for _ in range(COMPILE_SLICE):
+                    if parser.is_at_end():
+                        break
+                    stmts.append(parser.declaration())
+            except ParseError as e:
+                print(e.message, file=sys.stderr)
+                print("[line 1]", file=sys.stderr)
+                raise CompileFailed(65)
+        await asyncio.sleep(0)
+
+    slices = range(0, len(stmts), COMPILE_SLICE)
+    if options.get("optimize"):
+        optimizer = Optimizer()
+        for start in slices:
+            stmts[start : start + COMPILE_SLICE] = optimizer.optimize(
+                stmts[start : start + COMPILE_SLICE]
+            )
+            await asyncio.sleep(0)
+    resolver = Resolver()
+    for start in slices:
+        with contextlib.redirect_stderr(stderr):
+            try:
+                resolver.resolve(stmts[start : start + COMPILE_SLICE])
+            except ResolveError:
+                raise CompileFailed(70)
+        await asyncio.sleep(0)
+    return stmts, tokens.has_error
+
+
+async def run_async(
+    source: str,
+    sink: AsyncOutputSink,
+    options: dict[str, Any] = None,
+    slice_steps: int = SLICE_STEPS,
+) -> int:
+    """Run a program as a coroutine; returns the exit code `run` would use.
+
+    Compiling yields to the event loop as it goes (see `compile_async`),
+    and execution is a `GovernedInterpreter` stepped `slice_steps` work
+    items at a time. After each slice the lines printed are awaited on
+    `sink` and the run yields, so many runs on one loop take turns a slice
+    at a time. `--max-steps`-style `options` apply as they do for `run`.
+    Cancelling the task stops the run at its next await; the interpreter is
+    reset and the `CancelledError` propagates.
+    """
+    options = options or {}
+    limits = Limits.from_options(options)
+    output = MemorySink()
+    # made first so that the deadline counts from before scanning and
+    # parsing; it is checked once they are done and then while running
+    interpreter = GovernedInterpreter(output, limits)
+
+    stderr = io.StringIO()
+    try:
+        stmts, has_error = await compile_async(source, options, stderr)
+    except CompileFailed as e:
+        await sink.write_error(stderr.getvalue())
+        return e.exit_code
+    if stderr.getvalue():
+        await sink.write_error(stderr.getvalue())
+
+    try:
+        interpreter.check_deadline()
+    except ResourceLimitError as e:
+        await sink.write_error(f"{e.message}\n")
+        return LIMIT_EXIT_CODE
+    interpreter.start(stmts)
+    try:
+        while True:
+            try:
+                done = interpreter.step(slice_steps)
+            except EvaluationError as e:
+                exit_code, error = 70, f"{e.message}\n[line 1]\n"
+            except ResourceLimitError as e:
+                exit_code, error = LIMIT_EXIT_CODE, f"{e.message}\n"
+            except RuntimeError:
+                exit_code, error = 70, ""
+            else:
+                exit_code, error = None, ""
+            if output.lines:
+                lines, output.lines = output.lines, []
+                await sink.write_lines(lines)
+            if error:
+                await sink.write_error(error)
+            if exit_code is not None:
+                return exit_code
+            if done:
+                break
+            await asyncio.sleep(0)
+    except BaseException:
+        interpreter.stop()
+        raise
+    return 65 if has_error else 0
@@ -3,30 +3,42 @@ from typing import Any, List
 
 
 class Expr:
+    __slots__ = ()
+
     def accept(self, visitor):
         return visitor.visit(self)
 
 
 class Declaration:
+    __slots__ = ()
+
     def accept(self, visitor):
         return visitor.visit(self)
 
 
 class VariableDeclaration(Declaration):
+    __slots__ = ("name", "initializer", "slot")
+
     def __init__(self, name: Token, initializer: Expr):
         self.name = name
         self.initializer = initializer
+        # slot in the enclosing frame, filled in by the Resolver
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visitVariableDeclaration(self)
 
 
 class Stmt:
+    __slots__ = ()
+
     def accept(self, visitor):
         return visitor.visit(self)
 
 
 class Block(Stmt):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: List[Stmt]):
         self.statements = statements
 
@@ -35,6 +47,8 @@ class Block(Stmt):
 
 
 class Expression(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
@@ -43,6 +57,8 @@ class Expression(Stmt):
 
 
 class Print(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
@@ -52,24 +68,35 @@ class Print(Stmt):
 
 ##########################################################
 class Assignment(Expr):
+    __slots__ = ("name", "value", "depth", "slot")
 
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        # frames to hop and slot to read, filled in by the Resolver
+        self.depth = None
+        self.slot = None
 
-        def accept(self, visitor):
-            return visitor.visitAssignmentExpression(self)
+    def accept(self, visitor):
+        return visitor.visitAssignmentExpression(self)
 
 
 class Variable(Expr):
+    __slots__ = ("name", "depth", "slot")
+
     def __init__(self, name: Token):
         self.name = name
+        # frames to hop and slot to read, filled in by the Resolver
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visitVariableExpression(self)
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: Any):
         self.value = value
 
@@ -84,6 +111,8 @@ class Literal(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
@@ -93,16 +122,22 @@ class Unary(Expr):
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right", "quick")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        # specialization state owned by QuickeningInterpreter
+        self.quick = None
 
     def accept(self, visitor):
         return visitor.visitBinaryExpression(self)
 
 
 class Grouping(Expr):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
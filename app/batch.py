@@ -0,0 +1,191 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+
+class ScriptResult:
+    __slots__ = ("path", "stdout", "stderr", "exit_code", "seconds")
+
+    def __init__(self, path: str, stdout: str, stderr: str, exit_code: int, seconds: float):
+        self.path = path
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.seconds = seconds
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "exit_code": self.exit_code,
+            "seconds": self.seconds,
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+        }
+
+
+def exit_code_of(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    # sys.exit("message") prints the message and exits with 1
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def run_source(
+    command: str, filename: str, options: dict[str, Any], source: str = None
+) -> (str, str, int):
+    """Run one CLI command in this process, capturing what it writes.
+
+    `source`, when given, is the program text; `filename` is then only used
+    for the parse cache.
+
+    Returns `(stdout, stderr, exit_code)` with the same exit codes the CLI
+    would use: 65 for scan/parse errors, 70 for runtime errors, 1 for an
+    unexpected Python exception.
+    """
+    from app.main import run_command
+    from app.output import StreamSink
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    output = StreamSink(stdout, 0)
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            run_command(command, filename, options, output, source)
+        except SystemExit as e:
+            exit_code = exit_code_of(e)
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            output.flush()
+    return stdout.getvalue(), stderr.getvalue(), exit_code
+
+
+def run_script(path: str, options: dict[str, Any]) -> ScriptResult:
+    start = time.perf_counter()
+    stdout, stderr, exit_code = run_source("run", path, options)
+    return ScriptResult(path, stdout, stderr, exit_code, time.perf_counter() - start)
+
+
+def _run_scripts(paths: list[str], options: dict[str, Any]) -> list[ScriptResult]:
+    return [run_script(path, options) for path in paths]
+
+
+def _warm_worker() -> None:
+    # import everything a script run needs once per worker, not per script
+    import app.main  # noqa: F401
+
+
+def collect_scripts(targets: list[str]) -> list[str]:
+    """Expand directories into the `.lox` files under them, in sorted order."""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            for root, dirs, files in os.walk(target):
+                dirs.sort()
+                paths.extend(
+                    os.path.join(root, name) for name in sorted(files) if name.endswith(".lox")
+                )
+        else:
+            paths.append(target)
+    return paths
+
+
+def run_batch(
+    paths: list[str], options: dict[str, Any], jobs: int = None, chunk_size: int = 32
+):
+    """Yield a `ScriptResult` per script, in input order.
+
+    Scripts are handed to a pool of long-lived worker processes in chunks, so
+    interpreter startup and imports are paid once per worker.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    chunks = [paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    if jobs == 1:
+        _warm_worker()
+        for chunk in chunks:
+            yield from _run_scripts(chunk, options)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker) as pool:
+        for results in pool.map(_run_scripts, chunks, [options] * len(chunks)):
+            yield from results
+
+
+def write_outputs(result: ScriptResult, output_dir: str) -> None:
+    """Write a script's stdout and stderr under `output_dir`, mirroring its path.
+
+    Raises ValueError for a path that would land outside `output_dir`, such
+    as one with `..` components or one through a symlink leading out of it.
+    """
+    root = os.path.realpath(output_dir)
+    base = os.path.realpath(os.path.join(root, result.path.lstrip(os.sep)))
+    if os.path.commonpath([root, base]) != root or base == root:
+        raise ValueError(f"{result.path} would be written outside of {output_dir}")
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    with open(base + ".stdout", "w") as file:
+        file.write(result.stdout)
+    with open(base + ".stderr", "w") as file:
+        file.write(result.stderr)
+
+
+def batch_command(targets: list[str], options: dict[str, Any]) -> int:
+    """`batch` CLI entry point; returns 0 only if every script exited 0."""
+    paths = collect_scripts(targets)
+    if not paths:
+        print("No scripts to run.", file=sys.stderr)
+        return 1
+    try:
+        jobs = int(options["jobs"]) if options.get("jobs") else None
+        if jobs is not None and jobs < 1:
+            raise ValueError
+    except ValueError:
+        print("--jobs takes a positive integer", file=sys.stderr)
+        return 1
+    # scripts run with their own options; batch-only flags are not passed on
+    script_options = {
+        name: value
+        for name, value in options.items()
+        if name not in ("jobs", "results", "output-dir")
+    }
+
+    results_file = open(options["results"], "w") if options.get("results") else None
+    codes = Counter()
+    failures = []
+    start = time.perf_counter()
+    try:
+        for result in run_batch(paths, script_options, jobs):
+            codes[result.exit_code] += 1
+            if result.exit_code != 0:
+                failures.append(result)
+            if results_file is not None:
+                results_file.write(json.dumps(result.to_json()) + "\n")
+            if options.get("output-dir"):
+                try:
+                    write_outputs(result, options["output-dir"])
+                except ValueError as e:
+                    print(f"Not writing outputs: {e}", file=sys.stderr)
+    finally:
+        if results_file is not None:
+            results_file.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Ran {len(paths)} scripts in {elapsed:.2f}s")
+    for code in sorted(codes):
+        print(f"  exit {code}: {codes[code]}")
+    for result in failures[:20]:
+        message = result.stderr.strip().splitlines()[:1] or [""]
+        print(f"  FAIL {result.path} (exit {result.exit_code}) {message[0]}")
+    if len(failures) > 20:
+        print(f"  ... and {len(failures) - 20} more failures")
+    return 0 if not failures else 1
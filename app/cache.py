@@ -0,0 +1,120 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from typing import Any, Optional
+
+from app.ast import Stmt
+
+
+# Bump whenever the AST classes, the parser or the resolver change what a
+# cached program looks like.
+CACHE_VERSION = 2
+CACHE_DIR_NAME = "lox"
+CACHE_TAG = f"lox{CACHE_VERSION}-py{sys.version_info[0]}{sys.version_info[1]}"
+
+
+def cache_dir() -> str:
+    """The per-user cache directory, `$XDG_CACHE_HOME/lox` or `~/.cache/lox`."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_DIR_NAME)
+
+
+def private_dir(create: bool = False) -> Optional[str]:
+    """The cache directory, or None unless it is this user's and closed to others.
+
+    Entries are pickles, and loading a pickle can run code. So entries are
+    only read from, and written to, a real directory (not a symlink) that
+    belongs to the current user and has mode 0700.
+    """
+    directory = cache_dir()
+    try:
+        if create:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.lstat(directory)
+    except OSError:
+        return None
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        return None
+    return directory
+
+
+def cache_path(directory: str, filename: str) -> str:
+    """One entry per script, named from its absolute path and the cache format."""
+    path = os.path.abspath(filename)
+    digest = hashlib.sha256(path.encode(errors="surrogatepass")).hexdigest()[:32]
+    return os.path.join(
+        directory, f"{os.path.basename(path)}-{digest}.{CACHE_TAG}.pickle"
+    )
+
+
+def source_hash(source: str, options: dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    digest.update(CACHE_TAG.encode())
+    # passes that rewrite the AST are part of the key
+    digest.update(b"optimize" if options.get("optimize") else b"plain")
+    digest.update(b"\0")
+    digest.update(source.encode())
+    return digest.hexdigest()
+
+
+def load(filename: str, source: str, options: dict[str, Any]) -> Optional[list[Stmt]]:
+    """Return the cached resolved statements for `source`, or None on a miss.
+
+    A missing, stale or unreadable entry is a miss, never an error, and so
+    is a cache directory that other users could write to.
+    """
+    directory = private_dir()
+    if directory is None:
+        return None
+    try:
+        with open(cache_path(directory, filename), "rb") as file:
+            key, stmts = pickle.load(file)
+    except Exception:
+        return None
+    if key != source_hash(source, options):
+        return None
+    return stmts
+
+
+def store(filename: str, source: str, options: dict[str, Any], stmts: list[Stmt]) -> bool:
+    """Write the resolved statements for `source` into the cache.
+
+    The entry is written to a temporary file in the cache directory and
+    renamed into place, so concurrent runs only ever see a complete entry.
+    """
+    directory = private_dir(create=True)
+    if directory is None:
+        return False
+    tmp_path = None
+    try:
+        data = pickle.dumps(
+            (source_hash(source, options), stmts), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, cache_path(directory, filename))
+        return True
+    except (OSError, pickle.PicklingError, RecursionError):
+        # caching is best effort: a full disk or an AST too deep to
+        # pickle just means the next run parses again
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+        return False
+
+
+def clear(filename: str) -> None:
+    """Drop the entry for `filename`."""
+    directory = private_dir()
+    if directory is not None:
+        with contextlib.suppress(OSError):
+            os.unlink(cache_path(directory, filename))
@@ -0,0 +1,95 @@
+"""Thin client for the Lox daemon (`./your_program.sh serve <socket>`).
+
+Takes the same arguments as `app.main` and, when `LOX_DAEMON_SOCKET` names a
+running daemon, sends the script there and replays its stdout, stderr and
+exit code. Anything the daemon does not serve, or a daemon that is not
+running, falls back to running `app.main` in this process. Only standard
+library modules needed for the round trip are imported up front.
+"""
+import json
+import os
+import socket
+import sys
+
+
+ENV_VAR = "LOX_DAEMON_SOCKET"
+SERVED_COMMANDS = ("tokenize", "parse", "evaluate", "run")
+# options that name files are resolved here, since the daemon has its own cwd
+PATH_OPTIONS = ("profile-output", "bindings", "output")
+
+
+def parse_options(argv: list[str]) -> (list[str], dict):
+    args = []
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            name, sep, value = arg[2:].partition("=")
+            options[name] = value if sep else True
+        else:
+            args.append(arg)
+    return args, options
+
+
+def send(path: str, request: dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        conn.sendall(json.dumps(request).encode() + b"\n")
+        conn.shutdown(socket.SHUT_WR)
+        data = bytearray()
+        while True:
+            chunk = conn.recv(1 << 16)
+            if not chunk:
+                break
+            data += chunk
+    if not data:
+        raise EOFError("Lox daemon worker exited before replying.")
+    return json.loads(data.decode())
+
+
+def run_locally(argv: list[str]):
+    from app.main import main
+
+    sys.argv = [sys.argv[0]] + argv
+    main()
+
+
+def main(argv: list[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = os.environ.get(ENV_VAR)
+    args, options = parse_options(argv)
+    if not path or len(args) != 2 or args[0] not in SERVED_COMMANDS:
+        return run_locally(argv)
+    command, filename = args
+    try:
+        with open(filename) as file:
+            source = file.read()
+    except OSError:
+        # let the CLI report it exactly as it always has
+        return run_locally(argv)
+    for name in PATH_OPTIONS:
+        if isinstance(options.get(name), str):
+            options[name] = os.path.abspath(options[name])
+
+    request = {
+        "command": command,
+        "filename": os.path.abspath(filename),
+        "source": source,
+        "options": options,
+    }
+    try:
+        reply = send(path, request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return run_locally(argv)
+    except (OSError, EOFError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(70)
+
+    print("Logs from your program will appear here!", file=sys.stderr)
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    sys.stdout.flush()
+    sys.exit(reply["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import operator
+from typing import Any, Callable
+from app.ast import (
+    Expr,
+    Literal,
+    Grouping,
+    Unary,
+    Binary,
+    Print,
+    Expression,
+    Stmt,
+    Variable,
+    VariableDeclaration,
+    Assignment,
+    Block,
+)
+from app.scanner import TokenType
+from app.environment import Environment
+from app.interpreter import EvaluationError
+from app.output import OutputSink, StreamSink
+from app.utils import stringify, is_truthy, is_equal
+from app.rope import STRING_TYPES, concat
+
+
+# A compiled node: takes the current frame, returns the node's value.
+Compiled = Callable[[Environment], Any]
+
+NUMERIC_OPERATORS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+
+class ClosureCompiler:
+    """Walks a resolved AST once and turns every node into a Python closure.
+
+    The node type and operator are inspected only at compile time; running
+    the program is a chain of direct calls. Requires the `Resolver` to have
+    tagged variables with their (depth, slot).
+    """
+
+    def __init__(self, output: OutputSink = None):
+        self.output = output if output is not None else StreamSink()
+
+    def compile(self, stmts: list[Stmt]) -> Callable[[Environment], None]:
+        compiled = [self.compileStatement(stmt) for stmt in stmts if stmt]
+
+        def program(env: Environment) -> None:
+            for stmt in compiled:
+                stmt(env)
+
+        return program
+
+    def compileStatement(self, stmt: Stmt) -> Compiled:
+        if isinstance(stmt, Print):
+            expr = self.compileExpression(stmt.expr)
+            write_line = self.output.write_line
+
+            def print_statement(env):
+                write_line(stringify(expr(env)))
+
+            return print_statement
+        elif isinstance(stmt, Expression):
+            return self.compileExpression(stmt.expr)
+        elif isinstance(stmt, VariableDeclaration):
+            return self.compileVariableDeclaration(stmt)
+        elif isinstance(stmt, Block):
+            return self.compileBlock(stmt)
+        elif isinstance(stmt, Expr):
+            return self.compileExpression(stmt)
+        raise ValueError(f"Unexpected statement type: {type(stmt)}")
+
+    def compileVariableDeclaration(self, stmt: VariableDeclaration) -> Compiled:
+        slot = stmt.slot
+        if stmt.initializer is None:
+
+            def declare_nil(env):
+                env.define(slot, None)
+
+            return declare_nil
+        initializer = self.compileExpression(stmt.initializer)
+
+        def declare(env):
+            env.define(slot, initializer(env))
+
+        return declare
+
+    def compileBlock(self, stmt: Block) -> Compiled:
+        statements = [self.compileStatement(inner) for inner in stmt.statements if inner]
+
+        def block(env):
+            inner = Environment(env)
+            for statement in statements:
+                statement(inner)
+
+        return block
+
+    def compileExpression(self, expr: Expr) -> Compiled:
+        if isinstance(expr, Literal):
+            value = expr.value
+            return lambda env: value
+        elif isinstance(expr, Grouping):
+            return self.compileExpression(expr.expr)
+        elif isinstance(expr, Unary):
+            return self.compileUnary(expr)
+        elif isinstance(expr, Binary):
+            return self.compileBinary(expr)
+        elif isinstance(expr, Variable):
+            return self.compileVariable(expr)
+        elif isinstance(expr, Assignment):
+            return self.compileAssignment(expr)
+        raise ValueError(f"Unexpected expression type: {type(expr)}")
+
+    def compileVariable(self, expr: Variable) -> Compiled:
+        depth, slot = expr.depth, expr.slot
+        if depth == 0:
+            return lambda env: env.values[slot]
+        elif depth == 1:
+            return lambda env: env.enclosing.values[slot]
+        return lambda env: env.ancestor(depth).values[slot]
+
+    def compileAssignment(self, expr: Assignment) -> Compiled:
+        depth, slot = expr.depth, expr.slot
+        value = self.compileExpression(expr.value)
+
+        if depth == 0:
+
+            def assign_local(env):
+                result = env.values[slot] = value(env)
+                return result
+
+            return assign_local
+
+        def assign(env):
+            result = env.ancestor(depth).values[slot] = value(env)
+            return result
+
+        return assign
+
+    def compileUnary(self, expr: Unary) -> Compiled:
+        right = self.compileExpression(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+
+            def negate(env):
+                value = right(env)
+                if not isinstance(value, float):
+                    raise EvaluationError(f"Operand must be a number")
+                return -1 * value
+
+            return negate
+        elif expr.operator.type == TokenType.BANG:
+            return lambda env: not is_truthy(right(env))
+        return lambda env: None
+
+    def compileBinary(self, expr: Binary) -> Compiled:
+        left = self.compileExpression(expr.left)
+        right = self.compileExpression(expr.right)
+        operator_type = expr.operator.type
+
+        if operator_type in NUMERIC_OPERATORS:
+            op = NUMERIC_OPERATORS[operator_type]
+
+            def numeric(env):
+                lhs = left(env)
+                rhs = right(env)
+                if isinstance(lhs, float) and isinstance(rhs, float):
+                    return op(lhs, rhs)
+                raise EvaluationError(f"Operands must be numbers")
+
+            return numeric
+        elif operator_type == TokenType.EQUAL_EQUAL:
+            return lambda env: is_equal(left(env), right(env))
+        elif operator_type == TokenType.BANG_EQUAL:
+            return lambda env: not is_equal(left(env), right(env))
+        elif operator_type == TokenType.PLUS:
+
+            def plus(env):
+                lhs = left(env)
+                rhs = right(env)
+                if isinstance(lhs, (float, int, complex)) and isinstance(
+                    rhs, (float, int, complex)
+                ):
+                    return float(lhs) + float(rhs)
+                elif isinstance(lhs, STRING_TYPES) and isinstance(rhs, STRING_TYPES):
+                    return concat(lhs, rhs)
+                raise EvaluationError(
+                    f"+ operator should be either numbers or strings, but encountered {lhs} and {rhs}"
+                )
+
+            return plus
+        return lambda env: None
@@ -0,0 +1,285 @@
+from enum import IntEnum
+from typing import Any
+from app.ast import (
+    Expr,
+    Literal,
+    Grouping,
+    Unary,
+    Binary,
+    Print,
+    Expression,
+    Stmt,
+    Variable,
+    VariableDeclaration,
+    Assignment,
+    Block,
+)
+from app.scanner import Token, TokenType
+
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    GET_GLOBAL = 7
+    SET_GLOBAL = 8
+    DEFINE_GLOBAL = 9
+    EQUAL = 10
+    NOT_EQUAL = 11
+    GREATER = 12
+    GREATER_EQUAL = 13
+    LESS = 14
+    LESS_EQUAL = 15
+    ADD = 16
+    SUBTRACT = 17
+    MULTIPLY = 18
+    DIVIDE = 19
+    NOT = 20
+    NEGATE = 21
+    PRINT = 22
+    POPN = 23
+    RETURN = 24
+
+
+BINARY_OPCODES = {
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+}
+
+UNARY_OPCODES = {
+    TokenType.BANG: OpCode.NOT,
+    TokenType.MINUS: OpCode.NEGATE,
+}
+
+# the same tables as plain ints, which is what the compiler writes into
+# `Chunk.code`: comparing an IntEnum member costs the VM more than an int
+BINARY_CODES = {token_type: op.value for token_type, op in BINARY_OPCODES.items()}
+UNARY_CODES = {token_type: op.value for token_type, op in UNARY_OPCODES.items()}
+CONSTANT = OpCode.CONSTANT.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+
+# opcodes followed by a single operand in the code stream
+OPERAND_OPCODES = {
+    OpCode.CONSTANT,
+    OpCode.GET_LOCAL,
+    OpCode.SET_LOCAL,
+    OpCode.GET_GLOBAL,
+    OpCode.SET_GLOBAL,
+    OpCode.DEFINE_GLOBAL,
+    OpCode.POPN,
+}
+
+
+class CompileError(Exception):
+    def __init__(self, m):
+        self.message = m
+
+    def __str__(self):
+        return self.message
+
+
+class Chunk:
+    """A flat sequence of opcodes and operands with its constant pool.
+
+    `lines` runs parallel to `code` so the VM can report the source line
+    of the instruction that failed.
+    """
+
+    def __init__(self):
+        self.code: list[int] = []
+        self.lines: list[int] = []
+        self.constants: list[Any] = []
+        self._constant_index: dict = {}
+
+    def write(self, byte: int, line: int) -> None:
+        self.code.append(byte)
+        self.lines.append(line)
+
+    def add_constant(self, value: Any) -> int:
+        # bools compare equal to 0.0/1.0, so key on the type as well
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def disassemble(self) -> list[str]:
+        out = []
+        offset = 0
+        while offset < len(self.code):
+            op = OpCode(self.code[offset])
+            if op in OPERAND_OPCODES:
+                operand = self.code[offset + 1]
+                if op == OpCode.CONSTANT or op in (
+                    OpCode.GET_GLOBAL,
+                    OpCode.SET_GLOBAL,
+                    OpCode.DEFINE_GLOBAL,
+                ):
+                    out.append(f"{offset:04} {op.name} {operand} ({self.constants[operand]!r})")
+                else:
+                    out.append(f"{offset:04} {op.name} {operand}")
+                offset += 2
+            else:
+                out.append(f"{offset:04} {op.name}")
+                offset += 1
+        return out
+
+
+class Compiler:
+    """Compiles a list of statements into a single `Chunk` for the `VM`.
+
+    Block-scoped variables are resolved to stack slots at compile time, while
+    top level variables stay in the VM's globals table, mirroring the
+    tree-walker's outermost `Environment`.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk()
+        self.code = self.chunk.code
+        self.lines = self.chunk.lines
+        # one dict per open block mapping a name to its stack slot
+        self.scopes: list[dict[str, int]] = []
+        self.local_count = 0
+        self.line = 1
+
+    def compile(self, stmts: list[Stmt]) -> Chunk:
+        for stmt in stmts:
+            if not stmt:
+                continue
+            self.compileStatement(stmt)
+        self.emit(OpCode.RETURN)
+        return self.chunk
+
+    def emit(self, op: int, operand: int = None) -> None:
+        self.code.append(int(op))
+        self.lines.append(self.line)
+        if operand is not None:
+            self.code.append(operand)
+            self.lines.append(self.line)
+
+    def compileStatement(self, stmt: Stmt) -> None:
+        if isinstance(stmt, Print):
+            self.compileExpression(stmt.expr)
+            self.emit(OpCode.PRINT)
+        elif isinstance(stmt, Expression):
+            self.compileExpression(stmt.expr)
+            self.emit(OpCode.POP)
+        elif isinstance(stmt, VariableDeclaration):
+            self.compileVariableDeclaration(stmt)
+        elif isinstance(stmt, Block):
+            self.compileBlock(stmt)
+        elif isinstance(stmt, Expr):
+            self.compileExpression(stmt)
+            self.emit(OpCode.POP)
+        else:
+            raise CompileError(f"Unexpected statement type: {type(stmt)}")
+
+    def compileVariableDeclaration(self, stmt: VariableDeclaration) -> None:
+        self.line = stmt.name.line
+        # the initializer is compiled before the name is declared so that
+        # `var a = a;` inside a block reads the enclosing `a`
+        if stmt.initializer is not None:
+            self.compileExpression(stmt.initializer)
+        else:
+            self.emit(OpCode.NIL)
+        self.line = stmt.name.line
+        name = stmt.name.lexeme
+        if not self.scopes:
+            self.emit(OpCode.DEFINE_GLOBAL, self.chunk.add_constant(name))
+            return
+        scope = self.scopes[-1]
+        if name in scope:
+            # redeclaring in the same block overwrites the existing slot
+            self.emit(OpCode.SET_LOCAL, scope[name])
+            self.emit(OpCode.POP)
+        else:
+            # the value just pushed becomes the local's slot
+            scope[name] = self.local_count
+            self.local_count += 1
+
+    def compileBlock(self, stmt: Block) -> None:
+        self.scopes.append({})
+        for inner in stmt.statements:
+            if not inner:
+                continue
+            self.compileStatement(inner)
+        scope = self.scopes.pop()
+        if scope:
+            self.emit(OpCode.POPN, len(scope))
+            self.local_count -= len(scope)
+
+    def resolveLocal(self, name: Token) -> int:
+        for scope in reversed(self.scopes):
+            if name.lexeme in scope:
+                return scope[name.lexeme]
+        return -1
+
+    def compileExpression(self, expr: Expr) -> None:
+        # the hottest path of the compiler: instructions are appended
+        # directly rather than through `emit`, most common nodes first
+        code = self.code
+        lines = self.lines
+        if isinstance(expr, Binary):
+            self.compileExpression(expr.left)
+            self.compileExpression(expr.right)
+            self.line = line = expr.operator.line
+            code.append(BINARY_CODES[expr.operator.type])
+            lines.append(line)
+        elif isinstance(expr, Variable):
+            self.line = line = expr.name.line
+            slot = self.resolveLocal(expr.name) if self.scopes else -1
+            if slot >= 0:
+                code += (GET_LOCAL, slot)
+            else:
+                code += (GET_GLOBAL, self.chunk.add_constant(expr.name.lexeme))
+            lines += (line, line)
+        elif isinstance(expr, Literal):
+            value = expr.value
+            line = self.line
+            if value is None:
+                code.append(NIL)
+            elif value is True:
+                code.append(TRUE)
+            elif value is False:
+                code.append(FALSE)
+            else:
+                code += (CONSTANT, self.chunk.add_constant(value))
+                lines.append(line)
+            lines.append(line)
+        elif isinstance(expr, Grouping):
+            self.compileExpression(expr.expr)
+        elif isinstance(expr, Unary):
+            self.compileExpression(expr.right)
+            self.line = line = expr.operator.line
+            code.append(UNARY_CODES[expr.operator.type])
+            lines.append(line)
+        elif isinstance(expr, Assignment):
+            self.compileExpression(expr.value)
+            self.line = line = expr.name.line
+            slot = self.resolveLocal(expr.name) if self.scopes else -1
+            if slot >= 0:
+                code += (SET_LOCAL, slot)
+            else:
+                code += (SET_GLOBAL, self.chunk.add_constant(expr.name.lexeme))
+            lines += (line, line)
+        else:
+            raise CompileError(f"Unexpected expression type: {type(expr)}")
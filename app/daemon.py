@@ -0,0 +1,258 @@
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import time
+import traceback
+from typing import Any, Optional
+
+from app.batch import run_source, _warm_worker
+from app.diagnostics import diagnostics
+from app.governor import LIMIT_OPTIONS, parse_limit
+
+
+SERVED_COMMANDS = ("tokenize", "parse", "evaluate", "run")
+DEFAULT_TIMEOUT = 10
+MAX_REQUEST_SIZE = 64 << 20
+# a worker that dies sooner than this after starting is respawned with a delay,
+# so a worker that crashes on startup cannot turn the master into a fork loop
+MIN_WORKER_LIFETIME = 1.0
+
+
+class RequestTimeout(BaseException):
+    """Raised by SIGALRM inside a worker; not an Exception so scripts can't swallow it."""
+
+
+class Shutdown(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise RequestTimeout()
+
+
+def _on_terminate(signum, frame):
+    raise Shutdown()
+
+
+def read_message(conn: socket.socket) -> Optional[dict[str, Any]]:
+    """Read one newline-terminated JSON message; None if the peer sent nothing."""
+    data = bytearray()
+    while b"\n" not in data:
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_REQUEST_SIZE:
+            raise ValueError("Request too large.")
+    if not data.strip():
+        return None
+    return json.loads(data.decode())
+
+
+def write_message(conn: socket.socket, message: dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def response(stdout: str, stderr: str, exit_code: int) -> dict[str, Any]:
+    return {"stdout": stdout, "stderr": stderr, "exit_code": exit_code}
+
+
+def apply_limits(options: dict[str, Any], limits: dict[str, Any]) -> dict[str, Any]:
+    """`options` with each of the server's resource limits as an upper bound."""
+    options = dict(options)
+    for name, cap in limits.items():
+        value = options.get(name)
+        options[name] = cap if value is None else min(parse_limit(name, value), cap)
+    return options
+
+
+def handle_request(
+    request: dict[str, Any], timeout: int, limits: dict[str, Any] = None
+) -> dict[str, Any]:
+    """Run one request and describe its result the way the CLI would report it.
+
+    A request is `{"command", "source", "filename", "options"}`. `filename`
+    only names the script's entry in the daemon user's own parse cache; the
+    cache directory never comes from the request (see `app.cache`). `limits`
+    maps `--max-steps`-style option names to caps the request cannot raise.
+    """
+    command = request.get("command")
+    if command not in SERVED_COMMANDS:
+        return response("", f"Unknown command: {command}\n", 1)
+    source = request.get("source")
+    if not isinstance(source, str):
+        return response("", "Request has no source.\n", 1)
+    options = request.get("options") or {}
+    # the workers have app.main imported already (see `_warm_worker`)
+    from app.main import ENGINES
+
+    if options.get("engine", "tree") not in ENGINES:
+        return response("", f"Unknown engine: {options['engine']}\n", 1)
+    try:
+        options = apply_limits(options, limits or {})
+    except ValueError as e:
+        return response("", f"{e}\n", 1)
+
+    diagnostics.reset()
+    try:
+        if options.get("debug"):
+            try:
+                diagnostics.configure("all" if options["debug"] is True else options["debug"])
+            except ValueError as e:
+                return response("", f"{e}\n", 1)
+        signal.alarm(timeout)
+        try:
+            stdout, stderr, exit_code = run_source(
+                command, request.get("filename") or "<daemon>", options, source
+            )
+        finally:
+            signal.alarm(0)
+    except RequestTimeout:
+        return response("", f"Script exceeded the {timeout}s time limit.\n", 70)
+    finally:
+        diagnostics.reset()
+    return response(stdout, stderr, exit_code)
+
+
+def worker_loop(
+    listener: socket.socket, timeout: int, max_requests: int, limits: dict[str, Any] = None
+) -> None:
+    """Serve connections, one request each, until `max_requests` have been handled."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    handled = 0
+    while not max_requests or handled < max_requests:
+        conn, _ = listener.accept()
+        with conn:
+            try:
+                request = read_message(conn)
+                if request is None:
+                    continue
+                write_message(conn, handle_request(request, timeout, limits))
+            except ValueError as e:
+                write_message(conn, response("", f"Bad request: {e}\n", 1))
+            except OSError:
+                # the client went away; nothing to answer
+                pass
+        handled += 1
+
+
+def spawn_worker(
+    listener: socket.socket, timeout: int, max_requests: int, limits: dict[str, Any] = None
+) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 0
+    try:
+        worker_loop(listener, timeout, max_requests, limits)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        # never fall back into the master's code in a forked child
+        os._exit(code)
+
+
+def bind(path: str) -> socket.socket:
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)  # left behind by a daemon that did not shut down cleanly
+    except FileNotFoundError:
+        pass
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    # requests can make the daemon write files (--output, --profile-output),
+    # so only this user may connect; nobody can connect before listen()
+    os.chmod(path, 0o600)
+    listener.listen(128)
+    return listener
+
+
+def serve(
+    path: str,
+    workers: int = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    max_requests: int = 0,
+    limits: dict[str, Any] = None,
+) -> int:
+    """Listen on the Unix socket `path` and serve requests with pre-forked workers.
+
+    Workers are forked after the interpreter modules are imported, so each one
+    starts warm. A worker handles one request at a time under a SIGALRM
+    deadline of `timeout` seconds; one that crashes, is killed or reaches
+    `max_requests` is replaced, and the other workers keep serving. `limits`
+    caps the resource limits of every `run` request, so a script is stopped
+    cleanly with its partial output instead of being cut off by the alarm.
+    """
+    workers = workers or os.cpu_count() or 1
+    _warm_worker()
+    listener = bind(path)
+    children: dict[int, float] = {}
+    signal.signal(signal.SIGTERM, _on_terminate)
+    print(f"Lox daemon listening on {path} with {workers} workers", file=sys.stderr)
+    try:
+        for _ in range(workers):
+            children[spawn_worker(listener, timeout, max_requests, limits)] = time.monotonic()
+        while True:
+            pid, status = os.wait()
+            started = children.pop(pid, None)
+            if started is None:
+                continue
+            if os.WIFSIGNALED(status):
+                print(
+                    f"Worker {pid} killed by signal {os.WTERMSIG(status)}; respawning",
+                    file=sys.stderr,
+                )
+            elif os.WEXITSTATUS(status) != 0:
+                print(
+                    f"Worker {pid} exited with status {os.WEXITSTATUS(status)}; respawning",
+                    file=sys.stderr,
+                )
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            children[spawn_worker(listener, timeout, max_requests, limits)] = time.monotonic()
+    except (Shutdown, KeyboardInterrupt):
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return 0
+
+
+def serve_command(path: str, options: dict[str, Any]) -> int:
+    """`serve` CLI entry point."""
+    try:
+        workers = int(options["workers"]) if options.get("workers") else None
+        timeout = int(options.get("timeout", DEFAULT_TIMEOUT))
+        max_requests = int(options.get("max-requests", 0))
+    except ValueError:
+        print("--workers, --timeout and --max-requests take integers", file=sys.stderr)
+        return 1
+    try:
+        limits = {
+            name: parse_limit(name, options[name])
+            for name in LIMIT_OPTIONS
+            if options.get(name) is not None
+        }
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return serve(path, workers, timeout, max_requests, limits)
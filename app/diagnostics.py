@@ -0,0 +1,68 @@
+import os
+import sys
+
+
+TRACE = 5
+DEBUG = 10
+INFO = 20
+OFF = 100
+
+LEVELS = {"trace": TRACE, "debug": DEBUG, "info": INFO, "off": OFF}
+
+CATEGORIES = ("scanner", "parser", "interpreter")
+
+ENV_VAR = "LOX_DEBUG"
+
+
+class Diagnostics:
+    """Leveled debug output, configured per category.
+
+    Everything is off by default. Hot paths should not call `log`
+    unconditionally: they check `enabled` once (usually when the scanner,
+    parser or interpreter is constructed) and keep the result in a local
+    flag, so a disabled category costs a single boolean test and no string
+    formatting or I/O.
+    """
+
+    def __init__(self):
+        self.levels: dict[str, int] = {category: OFF for category in CATEGORIES}
+        self.stream = None
+
+    def configure(self, spec: str) -> None:
+        """Apply a spec such as `parser,scanner=trace` or `all=debug`.
+
+        A category without `=level` is enabled at DEBUG.
+        """
+        for item in spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            category, _, level_name = item.partition("=")
+            level = LEVELS.get(level_name.strip().lower() or "debug")
+            if level is None:
+                raise ValueError(f"Unknown diagnostics level: {level_name}")
+            if category == "all":
+                for name in self.levels:
+                    self.levels[name] = level
+            elif category in self.levels:
+                self.levels[category] = level
+            else:
+                raise ValueError(f"Unknown diagnostics category: {category}")
+
+    def reset(self) -> None:
+        for name in self.levels:
+            self.levels[name] = OFF
+
+    def enabled(self, category: str, level: int = DEBUG) -> bool:
+        return self.levels[category] <= level
+
+    def log(self, category: str, message: str) -> None:
+        print(f"[{category}] {message}", file=self.stream or sys.stderr)
+
+
+diagnostics = Diagnostics()
+if os.environ.get(ENV_VAR):
+    try:
+        diagnostics.configure(os.environ[ENV_VAR])
+    except ValueError as e:
+        print(f"{ENV_VAR}: {e}", file=sys.stderr)
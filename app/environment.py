@@ -1,38 +1,43 @@
-from app.scanner import Token
-from typing import Any, Dict
-import sys
+from typing import Any, List
 
 
 class Environment:
+    """A single scope frame.
+
+    Variables live in a flat list indexed by the slot the Resolver assigned,
+    so a lookup is a fixed number of `enclosing` hops plus a list index.
+    """
 
     def __init__(self, enclosing=None):
-        self.values: Dict[str, Any] = {}
+        self.values: List[Any] = []
         self.enclosing = enclosing
 
-    def define(self, name: str, value: Any) -> None:
+    def define(self, slot: int, value: Any) -> None:
         """Define a new variable or update an existing one."""
-        self.values[name] = value
-
-    def get(self, name: Token) -> Any:
-        """Get the value of a variable."""
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
-        elif self.enclosing:
-            return self.enclosing.get(name)
+        values = self.values
+        if slot == len(values):
+            values.append(value)
+        elif slot < len(values):
+            values[slot] = value
         else:
-            msg = f"Undefined variable '{name.lexeme}'."
-            print(msg, file=sys.stderr)
-            print(f"[line {name.line}]", file=sys.stderr)
-            raise RuntimeError(msg)
-
-    def assign(self, name: Token, value: Any) -> None:
-        """Assign a new value to an existing variable."""
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-        elif self.enclosing:
-            self.enclosing.assign(name, value)
+            values.extend([None] * (slot - len(values)))
+            values.append(value)
+
+    def ancestor(self, depth: int) -> "Environment":
+        env = self
+        for _ in range(depth):
+            env = env.enclosing
+        return env
+
+    def get_at(self, depth: int, slot: int) -> Any:
+        """Get the value of a resolved variable."""
+        if depth == 0:
+            return self.values[slot]
+        return self.ancestor(depth).values[slot]
+
+    def assign_at(self, depth: int, slot: int, value: Any) -> None:
+        """Assign a new value to an existing resolved variable."""
+        if depth == 0:
+            self.values[slot] = value
         else:
-            msg = f"Undefined variable '{name.lexeme}'."
-            print(msg, file=sys.stderr)
-            print(f"[line {name.line}]", file=sys.stderr)
-            raise RuntimeError(msg)
+            self.ancestor(depth).values[slot] = value
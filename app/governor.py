@@ -0,0 +1,152 @@
+import math
+import time
+from typing import Any, Optional
+
+from app.environment import Environment
+from app.output import OutputSink
+from app.scanner import TokenType
+from app.stack_interpreter import StackInterpreter
+
+
+# exit status for a run stopped by a limit; 65 and 70 are scan/parse and
+# runtime errors
+LIMIT_EXIT_CODE = 71
+# work items run between deadline checks: large enough that reading the
+# clock costs nothing, small enough to stop within a few milliseconds
+SLICE_STEPS = 10_000
+
+# option name -> (Limits attribute, parser)
+LIMIT_OPTIONS = {
+    "max-steps": ("max_steps", int),
+    "max-string": ("max_string", int),
+    "max-depth": ("max_depth", int),
+    "deadline": ("deadline", float),
+}
+
+
+def parse_limit(name: str, value: Any):
+    """The value of the limit option `name`; ValueError unless it is a finite number >= 0."""
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        parsed = LIMIT_OPTIONS[name][1](value)
+        # nan compares false with everything, so it would never fire
+        if not math.isfinite(parsed) or parsed < 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for --{name}: {value}")
+    return parsed
+
+
+class ResourceLimitError(Exception):
+    def __init__(self, m):
+        self.message = m
+
+    def __str__(self):
+        return self.message
+
+
+class Limits:
+    """Per-run resource limits; None means unlimited."""
+
+    __slots__ = ("max_steps", "max_string", "max_depth", "deadline")
+
+    def __init__(
+        self,
+        max_steps: int = None,
+        max_string: int = None,
+        max_depth: int = None,
+        deadline: float = None,
+    ):
+        self.max_steps = max_steps
+        self.max_string = max_string
+        self.max_depth = max_depth
+        # seconds of wall-clock time, counted from when the interpreter is made
+        self.deadline = deadline
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any]) -> Optional["Limits"]:
+        """Limits from `--max-steps`-style options, or None if none are given."""
+        limits = cls()
+        given = False
+        for name, (attribute, _) in LIMIT_OPTIONS.items():
+            if options.get(name) is not None:
+                setattr(limits, attribute, parse_limit(name, options[name]))
+                given = True
+        return limits if given else None
+
+
+class GovernedEnvironment(Environment):
+    """An `Environment` that knows how many blocks deep it is."""
+
+    def __init__(self, enclosing=None):
+        super().__init__(enclosing)
+        self.depth = enclosing.depth + 1 if enclosing is not None else 0
+
+
+class GovernedInterpreter(StackInterpreter):
+    """Stack interpreter that stops a run once it exceeds its `Limits`.
+
+    The program runs in slices of `SLICE_STEPS` work items (nodes and
+    continuations). The step budget and the deadline are checked between
+    slices, and the step budget is exact because the last slice is cut short
+    to fit it. Callers check the deadline with `check_deadline` after
+    compiling, since the clock starts when the interpreter is made. String concatenations are checked as they happen and block
+    scopes as they are entered. The checks are cheap enough that they do not
+    change how long the work takes, and any limit that is hit raises
+    `ResourceLimitError` with the stacks cleared.
+    """
+
+    def __init__(self, output: OutputSink = None, limits: Limits = None):
+        super().__init__(output)
+        self.limits = limits or Limits()
+        self.environment = self.base_environment = GovernedEnvironment()
+        self.steps = 0
+        self.deadline = (
+            time.monotonic() + self.limits.deadline
+            if self.limits.deadline is not None
+            else None
+        )
+
+    def step(self, limit: int = -1) -> bool:
+        max_steps = self.limits.max_steps
+        while True:
+            budget = SLICE_STEPS if limit < 0 else min(limit, SLICE_STEPS)
+            if max_steps is not None:
+                budget = min(budget, max_steps - self.steps)
+            if super().step(budget):
+                return True
+            self.steps += budget
+            if max_steps is not None and self.steps >= max_steps:
+                self.fail(f"Step limit of {max_steps} exceeded.")
+            self.check_deadline()
+            if limit >= 0:
+                limit -= budget
+                if limit == 0:
+                    return False
+
+    def check_deadline(self) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.fail(f"Deadline of {self.limits.deadline:g}s exceeded.")
+
+    def new_scope(self, enclosing: GovernedEnvironment) -> GovernedEnvironment:
+        max_depth = self.limits.max_depth
+        if max_depth is not None and enclosing.depth >= max_depth:
+            raise ResourceLimitError(f"Scope depth limit of {max_depth} exceeded.")
+        return GovernedEnvironment(enclosing)
+
+    def binaryOperation(self, operator_type: TokenType, left: Any, right: Any):
+        result = super().binaryOperation(operator_type, left, right)
+        max_string = self.limits.max_string
+        if (
+            max_string is not None
+            and operator_type is TokenType.PLUS
+            and type(result) is not float
+            and len(result) > max_string
+        ):
+            raise ResourceLimitError(f"String length limit of {max_string} exceeded.")
+        return result
+
+    def fail(self, message: str):
+        self.stop()
+        raise ResourceLimitError(message)
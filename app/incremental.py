@@ -0,0 +1,136 @@
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+from app.ast import (
+    Stmt,
+    Unary,
+    Binary,
+    Grouping,
+    Print,
+    Expression,
+    VariableDeclaration,
+    Variable,
+    Assignment,
+    Block,
+)
+from app.parser import Parser
+from app.scanner import TokenArray
+
+
+def shift_lines(stmts: list[Stmt], delta: int) -> None:
+    """Move every token in `stmts` down `delta` lines."""
+    work = list(stmts)
+    while work:
+        node = work.pop()
+        if isinstance(node, Binary):
+            node.operator.line += delta
+            work.append(node.left)
+            work.append(node.right)
+        elif isinstance(node, Variable):
+            node.name.line += delta
+        elif isinstance(node, Unary):
+            node.operator.line += delta
+            work.append(node.right)
+        elif isinstance(node, Assignment):
+            node.name.line += delta
+            work.append(node.value)
+        elif isinstance(node, (Grouping, Print, Expression)):
+            work.append(node.expr)
+        elif isinstance(node, VariableDeclaration):
+            node.name.line += delta
+            if node.initializer is not None:
+                work.append(node.initializer)
+        elif isinstance(node, Block):
+            work.extend(node.statements)
+
+
+class IncrementalParser:
+    """Tokens and top-level statements of a source text, kept current under edits.
+
+    `bounds[i]` is the index of the first token of `statements[i]`, and the
+    last entry is the index of EOF. An edit rescans through
+    `TokenArray.edit`. It then reparses from the statement holding the first
+    changed token until it reaches an old statement boundary past the
+    change. Every statement after that boundary is kept as it was, with its
+    token lines shifted when the edit added or removed lines. A top-level
+    statement ends at its own `;` or `}`, so its parse depends only on its
+    own tokens.
+
+    A parse error is raised after the tokens have been updated. The
+    statements it made stale stay in `statements`, and their token range is
+    remembered in `dirty`, so the next edit reparses that range as well.
+    """
+
+    def __init__(self, source: str):
+        self.tokens = TokenArray(source, report=False)
+        self.statements: list[Stmt] = []
+        self.bounds = [len(self.tokens) - 1]
+        # token range [start, end) whose statements must be reparsed
+        self.dirty: Optional[tuple[int, int]] = (0, len(self.tokens) - 1)
+        self.reparse()
+
+    @property
+    def source(self) -> str:
+        return self.tokens.source
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> list[Stmt]:
+        """Replace `deleted` characters at `offset` with `inserted`; returns the statements."""
+        lines = len(self.tokens.line_starts)
+        first, old_end, new_end = self.tokens.edit(offset, deleted, inserted)
+        shift = new_end - old_end
+
+        # statements that started inside the replaced tokens are folded into
+        # the one before them, which holds `first` and so is reparsed anyway
+        bounds = self.bounds
+        # where the statement holding the first replaced token starts
+        changed = bounds[max(bisect_right(bounds, first) - 1, 0)]
+        # (EOF moves even when the edit is past the last token)
+        low = min(bisect_right(bounds, first), len(bounds) - 1)
+        high = bisect_left(bounds, old_end)
+        del bounds[low:high]
+        del self.statements[low:high]
+        if shift:
+            bounds[low:] = [index + shift for index in bounds[low:]]
+        lines = len(self.tokens.line_starts) - lines
+        if lines:
+            shift_lines(self.statements[low:], lines)
+
+        if self.dirty is None:
+            self.dirty = (min(changed, first), new_end)
+        else:
+            # still unparsed after an earlier parse error
+            start, end = self.dirty
+            if end >= old_end:
+                end += shift
+            elif end > first:
+                end = new_end
+            self.dirty = (min(start, changed, first), max(end, new_end))
+        return self.reparse()
+
+    def reparse(self) -> list[Stmt]:
+        start, end = self.dirty
+        bounds = self.bounds
+        # the earliest statement starting where the one holding `start`
+        # does; deleted statements are left with empty ranges there
+        first = bisect_left(bounds, bounds[max(bisect_right(bounds, start) - 1, 0)])
+        # before the first parse the only bound is EOF
+        position = min(bounds[first], start)
+        parser = Parser(self.tokens.iter_from(position))
+        base = position
+        statements = []
+        new_bounds = []
+        while True:
+            if position >= end:
+                resync = bisect_right(bounds, position, first) - 1
+                if resync >= first and bounds[resync] == position:
+                    break
+            if parser.is_at_end():
+                resync = len(bounds) - 1
+                break
+            new_bounds.append(position)
+            statements.append(parser.declaration())
+            position = base + parser.current
+        self.statements[first:resync] = statements
+        bounds[first:resync] = new_bounds
+        self.dirty = None
+        return self.statements
@@ -14,11 +14,12 @@ from app.ast import (
     Block,
 )
 from app.scanner import TokenType
-import sys
 from app.utils import stringify
+from app.rope import STRING_TYPES, concat
 from app.environment import Environment
-import pprint
+from app.output import OutputSink, StreamSink
 from app.ast_printer import AstPrinter
+from app.diagnostics import diagnostics, DEBUG, TRACE
 
 
 class EvaluationError(Exception):
@@ -31,14 +32,18 @@ class EvaluationError(Exception):
 
 class Interpreter:
 
-    def __init__(self):
+    def __init__(self, output: OutputSink = None):
         self.environment = Environment()
+        self.output = output if output is not None else StreamSink()
+        self.trace = diagnostics.enabled("interpreter", TRACE)
 
     def interpret(self, stmts: list[Stmt]):
         # try:
+        debug = diagnostics.enabled("interpreter", DEBUG)
         printer = AstPrinter()
         for stmt in stmts:
-            print("in interpret:", printer.print(stmt), file=sys.stderr)
+            if debug:
+                diagnostics.log("interpreter", f"in interpret: {printer.print(stmt)}")
             if not stmt:
                 continue
             self.evaluate(stmt)
@@ -62,7 +67,7 @@ class Interpreter:
 
     def visitPrintStatement(self, stmt: Print):
         value = self.visit(stmt.expr)
-        print(stringify(value))
+        self.output.write_line(stringify(value))
         return None
 
     def visitExpressionStatement(self, stmt: Expression):
@@ -71,7 +76,7 @@ class Interpreter:
 
     def visitAssignmentExpression(self, expr: Assignment):
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+        self.environment.assign_at(expr.depth, expr.slot, value)
         return value
 
     def visit(self, expr: Expr):
@@ -116,13 +121,13 @@ class Interpreter:
         return self.evaluate(expr.expr)
 
     def visitVariableExpression(self, expr: Variable):
-        return self.environment.get(expr.name)
+        return self.environment.get_at(expr.depth, expr.slot)
 
     def visitVariableDeclaration(self, stmt: VariableDeclaration):
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.environment.define(stmt.name.lexeme, value)
+        self.environment.define(stmt.slot, value)
         return value
 
     def _isTruthy(self, val: Any) -> bool:
@@ -150,8 +155,9 @@ class Interpreter:
     def visitBinaryExpression(self, expr: Binary):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
+        return self.binaryOperation(expr.operator.type, left, right)
 
-        operator_type = expr.operator.type
+    def binaryOperation(self, operator_type: TokenType, left: Any, right: Any):
         if operator_type == TokenType.GREATER:
             self._checkNumberOperands(left, right)
             return float(left) > float(right)
@@ -182,8 +188,8 @@ class Interpreter:
                 right, (float, int, complex)
             ):
                 return float(left) + float(right)
-            elif isinstance(left, str) and isinstance(right, str):
-                return str(left) + str(right)
+            elif isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+                return concat(left, right)
             else:
                 raise EvaluationError(
                     f"+ operator should be either numbers or strings, but encountered {left} and {right}"
@@ -192,14 +198,17 @@ class Interpreter:
 
     def visitUnaryExpression(self, expr: Unary):
         right = self.evaluate(expr.right)
-
-        if expr.operator.type == TokenType.MINUS:
-            print(
-                f"in visitUnary minus, right: {right}, {isinstance(right, (int, float))}",
-                file=sys.stderr,
-            )
+        return self.unaryOperation(expr.operator.type, right)
+
+    def unaryOperation(self, operator_type: TokenType, right: Any):
+        if operator_type == TokenType.MINUS:
+            if self.trace:
+                diagnostics.log(
+                    "interpreter",
+                    f"in visitUnary minus, right: {right}, {isinstance(right, (int, float))}",
+                )
             self._checkNumberOperand(right)
             return -1 * (float(right))
-        elif expr.operator.type == TokenType.BANG:
+        elif operator_type == TokenType.BANG:
             return not self._isTruthy(right)
         return None
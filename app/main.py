@@ -1,102 +1,353 @@
+import gc
 import sys
 
 from enum import Enum, auto
 from typing import Any
 from functools import partial
 
-from app.scanner import tokenize
+from app.scanner import TokenArray, TokenStream
+from app.parallel_scan import tokenize_parallel
 from app.parser import Parser, ParseError
 from app.ast_printer import AstPrinter
 from app.interpreter import Interpreter, EvaluationError
+from app.resolver import Resolver, ResolveError
+from app.optimizer import Optimizer
+from app.compiler import Compiler
+from app.vm import VM
+from app.closure_compiler import ClosureCompiler
+from app.environment import Environment
+from app.profiler import ProfilingInterpreter
+from app.quicken import QuickeningInterpreter
+from app.stack_interpreter import StackInterpreter
+from app.governor import GovernedInterpreter, Limits, ResourceLimitError, LIMIT_EXIT_CODE
+from app.batch import batch_command
+from app.daemon import serve_command
+from app.repl import Repl
+from app.vectorize import evaluate_bindings, VectorizeError
 from app.utils import stringify
+from app import cache
+from app.diagnostics import diagnostics
+from app.output import OutputSink, StreamSink, DEFAULT_BUFFER_SIZE
 
+COMMANDS = ["tokenize", "parse", "evaluate", "run", "batch", "serve", "repl"]
+ENGINES = ["tree", "vm", "closure", "stack"]
+# allocations between young-generation collections for a one-shot command
+GC_THRESHOLD = 100_000
 
-def print_value(val: Any):
-    print(stringify(val))
+
+def print_value(val: Any, output: OutputSink):
+    output.write_line(stringify(val))
+
+
+def parse_options(argv: list[str]) -> (list[str], dict[str, Any]):
+    """Split `--name=value` / `--flag` options from positional arguments."""
+    args = []
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            name, sep, value = arg[2:].partition("=")
+            options[name] = value if sep else True
+        else:
+            args.append(arg)
+    return args, options
+
+
+def scan(source: str, options: dict[str, Any]) -> TokenArray:
+    """Scan `source`, across worker processes when `--scan-jobs` is given."""
+    jobs = options.get("scan-jobs")
+    if jobs:
+        return tokenize_parallel(source, None if jobs is True else int(jobs))
+    return TokenArray(source)
+
+
+def execute(stmts, engine: str, output: OutputSink):
+    if engine == "vm":
+        chunk = Compiler().compile(stmts)
+        return VM(output).run(chunk)
+    if engine == "closure":
+        program = ClosureCompiler(output).compile(stmts)
+        return program(Environment())
+    if engine == "stack":
+        return StackInterpreter(output).interpret(stmts)
+    interpreter = Interpreter(output)
+    return interpreter.interpret(stmts)
+
+
+def compile_program(file_contents: str, options: dict[str, Any]):
+    """Scan, parse, optionally optimize and resolve a program.
+
+    Returns the resolved statements and whether the scanner reported errors.
+    """
+    tokens = scan(file_contents, options)
+    has_error = tokens.has_error
+    if diagnostics.enabled("scanner"):
+        for token in tokens:
+            diagnostics.log("scanner", str(token))
+    try:
+        parser = Parser(tokens)
+        stmts = parser.parse_statements()
+        # for stmt in stmts:
+        #     print(printer.print(stmt), file=sys.stderr)
+    except ParseError as e:
+        print(e.message, file=sys.stderr)
+        print("[line 1]", file=sys.stderr)
+        exit(65)
+
+    if options.get("optimize"):
+        stmts = Optimizer().optimize(stmts)
+
+    try:
+        Resolver().resolve(stmts)
+    except ResolveError:
+        exit(70)
+    return stmts, has_error
+
+
+def run(filename: str, file_contents: str, options: dict[str, Any], output: OutputSink):
+    try:
+        limits = Limits.from_options(options)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        exit(1)
+    # made first so that the deadline counts from before scanning and
+    # parsing; the clock is checked once they are done and then while the
+    # program runs
+    governor = GovernedInterpreter(output, limits) if limits is not None else None
+    use_cache = not options.get("no-cache")
+    if options.get("clear-cache"):
+        cache.clear(filename)
+
+    stmts = cache.load(filename, file_contents, options) if use_cache else None
+    has_error = False
+    if stmts is None:
+        stmts, has_error = compile_program(file_contents, options)
+        # scripts with scan errors still run, but always re-report them
+        if use_cache and not has_error:
+            cache.store(filename, file_contents, options, stmts)
+
+    # the profiler and the quickening interpreter are tree-walker
+    # subclasses, so they ignore --engine; resource limits need the stack
+    # engine and take precedence over all of them
+    profiler = (
+        ProfilingInterpreter(output)
+        if options.get("profile") and governor is None
+        else None
+    )
+    quickener = (
+        QuickeningInterpreter(output)
+        if options.get("quicken") and governor is None and profiler is None
+        else None
+    )
+    try:
+        if governor is not None:
+            governor.check_deadline()
+            result = governor.interpret(stmts)
+        elif profiler is not None:
+            result = profiler.interpret(stmts)
+        elif quickener is not None:
+            result = quickener.interpret(stmts)
+        else:
+            result = execute(stmts, options.get("engine", "tree"), output)
+    except EvaluationError as e:
+        print(e.message, file=sys.stderr)
+        print("[line 1]", file=sys.stderr)
+        exit(70)
+    except ResourceLimitError as e:
+        print(e.message, file=sys.stderr)
+        exit(LIMIT_EXIT_CODE)
+    except RuntimeError as e:
+        exit(70)
+    finally:
+        if profiler is not None:
+            for line in profiler.report():
+                print(line, file=sys.stderr)
+            if options.get("profile-output"):
+                # an unwritable profile must not hide the script's own
+                # exit code, which this finally block is on the way to
+                try:
+                    profiler.write_collapsed(options["profile-output"])
+                except OSError as e:
+                    print(
+                        f"Could not write profile to {options['profile-output']}: {e.strerror or e}",
+                        file=sys.stderr,
+                    )
+        if quickener is not None and options["quicken"] == "stats":
+            for line in quickener.report():
+                print(line, file=sys.stderr)
+
+    if has_error:
+        exit(65)
 
 
 def main():
     # You can use print statements as follows for debugging, they'll be visible when running tests.
     print("Logs from your program will appear here!", file=sys.stderr)
 
-    if len(sys.argv) < 3:
+    args, options = parse_options(sys.argv[1:])
+    if len(args) < 2 and args[:1] != ["repl"]:
         print(
-            "Usage: ./your_program.sh <tokenize|parse|evaluate|run> <filename>",
+            "Usage: ./your_program.sh <tokenize|parse|evaluate|run> <filename>\n"
+            "       ./your_program.sh batch <file-or-directory>... [--jobs=N] [--results=FILE.jsonl] [--output-dir=DIR]\n"
+            "       ./your_program.sh evaluate <filename> --bindings=FILE.csv|.npz|.npy [--output=FILE.csv|.npz]\n"
+            "       ./your_program.sh repl\n"
+            "       ./your_program.sh serve <socket-path> [--workers=N] [--timeout=SECONDS] [--max-requests=N] [limits]\n"
+            "Options: [--engine=tree|vm|closure|stack] [--optimize] [--no-cache] [--clear-cache] [--debug[=category[=level],...]] [--output-buffer=N] [--profile] [--profile-output=FILE] [--quicken[=stats]] [--scan-jobs[=N]]\n"
+            "Limits (run, serve): [--max-steps=N] [--max-string=N] [--max-depth=N] [--deadline=SECONDS]",
             file=sys.stderr,
         )
         exit(1)
 
-    command = sys.argv[1]
-    filename = sys.argv[2]
+    command = args[0]
+    filename = args[1] if len(args) > 1 else None
 
-    if command not in ["tokenize", "parse", "evaluate", "run"]:
+    if command not in COMMANDS:
         print(f"Unknown command: {command}", file=sys.stderr)
         exit(1)
 
-    with open(filename) as file:
-        file_contents = file.read()
+    if options.get("debug"):
+        try:
+            diagnostics.configure(
+                "all" if options["debug"] is True else options["debug"]
+            )
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            exit(1)
+
+    engine = options.get("engine", "tree")
+    if engine not in ENGINES:
+        print(f"Unknown engine: {engine}", file=sys.stderr)
+        exit(1)
+
+    if command == "batch":
+        exit(batch_command(args[1:], options))
+    if command == "serve":
+        exit(serve_command(filename, options))
+
+    if options.get("scan-jobs") not in (None, True) and not str(options["scan-jobs"]).isdigit():
+        print(f"Invalid scan job count: {options['scan-jobs']}", file=sys.stderr)
+        exit(1)
+
+    try:
+        buffer_size = int(options.get("output-buffer", DEFAULT_BUFFER_SIZE))
+    except ValueError:
+        print(f"Invalid output buffer size: {options['output-buffer']}", file=sys.stderr)
+        exit(1)
+
+    # all program output goes through one buffered sink; the finally block
+    # flushes it on normal exit, on exit(65/70) and on unexpected errors
+    output = StreamSink(sys.stdout, buffer_size)
+    if command == "repl":
+        Repl(output, options).run()
+        return
+    # A one-shot command builds its AST, and its closures or bytecode, and
+    # keeps nearly all of it until exit, so collections find little to free.
+    # Freezing what startup made and collecting young objects less often
+    # keeps the collector from walking that growing heap over and over.
+    # This is set for the CLI process only; library callers keep their own
+    # settings.
+    gc.freeze()
+    gc.set_threshold(GC_THRESHOLD, *gc.get_threshold()[1:])
+    try:
+        run_command(command, filename, options, output)
+    finally:
+        output.flush()
+
+
+def run_command(
+    command: str,
+    filename: str,
+    options: dict[str, Any],
+    output: OutputSink,
+    source: str = None,
+):
+    """Run one CLI command; `source`, when given, is used instead of reading `filename`."""
+    if command == "tokenize":
+        if source is None and options.get("scan-jobs"):
+            with open(filename) as file:
+                source = file.read()
+        if source is not None:
+            # already in memory: print straight from the token arrays
+            tokens = scan(source, options)
+            for line in tokens.lines():
+                output.write_line(line)
+            if tokens.has_error:
+                exit(65)
+            return
+        # stream tokens straight from the file so memory stays flat
+        with open(filename) as file:
+            stream = TokenStream(file)
+            for token in stream:
+                output.write_line(str(token))
+        if stream.has_error:
+            exit(65)
+        return
+
+    # Unlike tokenize, these commands read the whole file. `run` looks up
+    # the parse cache by a hash of the full text before scanning, and
+    # --scan-jobs splits the text. All scan errors are reported before the
+    # first parse error, which a stream cannot do. Streaming would not save
+    # much either: the parsed tree is kept until the command ends and is
+    # several times the size of the text and its TokenArray together.
+    if source is None:
+        with open(filename) as file:
+            file_contents = file.read()
+    else:
+        file_contents = source
 
     # Uncomment this block to pass the first stage
     if file_contents:
-        tokens, has_error = tokenize(file_contents)
-        if command == "tokenize":
-            for token in tokens:
-                print(token)
-        else:
-
-            if command == "parse":
-                parser = Parser(tokens[:-1])
-                exprs = parser.parse_expressions()
-                has_error = not exprs or len(exprs) <= 0
-                printer = AstPrinter()
-                for expr in exprs:
-                    print(printer.print(expr), file=sys.stderr)
-                    if exprs and len(exprs) > 0:
-                        # for expr in exprs:
-                        print(printer.print(exprs[0]))
-                    else:
-                        exit(65)
-            elif command == "evaluate":
-                parser = Parser(tokens[:-1])
-                exprs = parser.parse_expressions()
-                has_error = not exprs or len(exprs) <= 0
-                if has_error:
+        has_error = False
+        if command == "parse":
+            tokens = scan(file_contents, options)
+            parser = Parser(tokens)
+            exprs = parser.parse_expressions()
+            has_error = not exprs or len(exprs) <= 0
+            printer = AstPrinter()
+            debug = diagnostics.enabled("parser")
+            for expr in exprs:
+                if debug:
+                    diagnostics.log("parser", printer.print(expr))
+                if exprs and len(exprs) > 0:
+                    # for expr in exprs:
+                    output.write_line(printer.print(exprs[0]))
+                else:
                     exit(65)
-                interpreter = Interpreter()
+        elif command == "evaluate":
+            tokens = scan(file_contents, options)
+            parser = Parser(tokens)
+            exprs = parser.parse_expressions()
+            has_error = not exprs or len(exprs) <= 0
+            if has_error:
+                exit(65)
+            expr = exprs[0]
+            if options.get("optimize"):
+                expr = Optimizer().optimizeExpression(expr)
+            if options.get("bindings"):
                 try:
-                    result = interpreter.visit(exprs[0])
-                    print_value(result)
-                except EvaluationError as e:
+                    exit(evaluate_bindings(expr, options, output))
+                except VectorizeError as e:
                     print(e.message, file=sys.stderr)
-                    print("[line 1]", file=sys.stderr)
                     exit(70)
-            elif command == "run":
-                for token in tokens:
-                    print(token, file=sys.stderr)
-                try:
-                    parser = Parser(tokens[:-1])
-                    stmts = parser.parse_statements()
-                    # for stmt in stmts:
-                    #     print(printer.print(stmt), file=sys.stderr)
-                except ParseError as e:
-                    print(e.message, file=sys.stderr)
-                    print("[line 1]", file=sys.stderr)
-                    exit(65)
-
-                try:
-                    interpreter = Interpreter()
-                    result = interpreter.interpret(stmts)
-                except EvaluationError as e:
-                    print(e.message, file=sys.stderr)
-                    print("[line 1]", file=sys.stderr)
-                    exit(70)
-                except RuntimeError as e:
-                    exit(70)
-
+            if options.get("engine") == "stack":
+                interpreter = StackInterpreter(output)
+            else:
+                interpreter = Interpreter(output)
+            try:
+                Resolver().resolveExpression(expr)
+                result = interpreter.visit(expr)
+                print_value(result, output)
+            except EvaluationError as e:
+                print(e.message, file=sys.stderr)
+                print("[line 1]", file=sys.stderr)
+                exit(70)
+            except ResolveError:
+                exit(70)
+        elif command == "run":
+            run(filename, file_contents, options, output)
         if has_error:
             exit(65)
     else:
-        print(
+        output.write_line(
             "EOF  null"
         )  # Placeholder, remove this line when implementing the scanner
 
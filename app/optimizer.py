@@ -0,0 +1,190 @@
+from app.ast import (
+    Expr,
+    Literal,
+    Grouping,
+    Unary,
+    Binary,
+    Print,
+    Expression,
+    Stmt,
+    VariableDeclaration,
+    Assignment,
+    Block,
+)
+from app.scanner import TokenType
+from app.interpreter import Interpreter, EvaluationError
+from app.rope import Rope
+
+
+# marks a node on the optimizer's work stack whose children are done
+SIMPLIFY = "simplify"
+
+NUMBER_RESULT_OPERATORS = {TokenType.MINUS, TokenType.STAR, TokenType.SLASH}
+
+BOOLEAN_RESULT_OPERATORS = {
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+}
+
+
+class Optimizer:
+    """Constant folding and algebraic simplification over the AST.
+
+    Folding evaluates a node whose operands are all literals with the
+    interpreter's own operator code, so results are exactly what running it
+    would produce. Anything that would fail at runtime is left in place and
+    fails when it is executed. Identities such as `x * 1` are only applied
+    when `x` is known to evaluate to a number, so the interpreter's operand
+    checks cannot be skipped.
+    """
+
+    def __init__(self):
+        self.interpreter = Interpreter()
+
+    def optimize(self, stmts: list[Stmt]) -> list[Stmt]:
+        stmts = list(stmts)
+        # nested blocks come off a work list rather than recursion, so block
+        # depth is not limited by the Python stack
+        bodies = [stmts]
+        while bodies:
+            body = bodies.pop()
+            for index, stmt in enumerate(body):
+                if isinstance(stmt, Block):
+                    bodies.append(stmt.statements)
+                elif stmt:
+                    body[index] = self.optimizeStatement(stmt)
+        return stmts
+
+    def optimizeStatement(self, stmt: Stmt) -> Stmt:
+        if isinstance(stmt, (Print, Expression)):
+            stmt.expr = self.optimizeExpression(stmt.expr)
+        elif isinstance(stmt, VariableDeclaration):
+            if stmt.initializer is not None:
+                stmt.initializer = self.optimizeExpression(stmt.initializer)
+        elif isinstance(stmt, Block):
+            stmt.statements = self.optimize(stmt.statements)
+        elif isinstance(stmt, Expr):
+            return self.optimizeExpression(stmt)
+        return stmt
+
+    def optimizeExpression(self, expr: Expr) -> Expr:
+        """Optimize `expr` bottom-up with an explicit stack.
+
+        Like the resolver's walk, this does not recurse, so a deeply nested
+        expression cannot exhaust the Python stack.
+        """
+        work = [expr]
+        results = []
+        while work:
+            node = work.pop()
+            if isinstance(node, tuple):
+                # children are optimized; simplify the node itself
+                _, node = node
+                if isinstance(node, Unary):
+                    node.right = results.pop()
+                    results.append(self.simplifyUnary(node))
+                elif isinstance(node, Binary):
+                    node.right = results.pop()
+                    node.left = results.pop()
+                    results.append(self.simplifyBinary(node))
+                else:
+                    node.value = results.pop()
+                    results.append(node)
+            elif isinstance(node, Grouping):
+                # parentheses only matter to the parser
+                work.append(node.expr)
+            elif isinstance(node, Binary):
+                work.append((SIMPLIFY, node))
+                work.append(node.right)
+                work.append(node.left)
+            elif isinstance(node, (Unary, Assignment)):
+                work.append((SIMPLIFY, node))
+                work.append(node.right if isinstance(node, Unary) else node.value)
+            else:
+                results.append(node)
+        return results.pop()
+
+    def fold(self, expr: Expr) -> Expr:
+        try:
+            value = self.interpreter.evaluate(expr)
+        except (EvaluationError, ArithmeticError):
+            return expr
+        # literals hold plain strings; ropes are a runtime representation
+        return Literal(str(value) if isinstance(value, Rope) else value)
+
+    def simplifyUnary(self, expr: Unary) -> Expr:
+        right = expr.right
+        if isinstance(right, Literal):
+            return self.fold(expr)
+        if isinstance(right, Unary) and right.operator.type == expr.operator.type:
+            inner = right.right
+            # -(-x) is x for any number, !!x is x for any boolean
+            if expr.operator.type == TokenType.MINUS and isNumber(inner):
+                return inner
+            if expr.operator.type == TokenType.BANG and isBoolean(inner):
+                return inner
+        return expr
+
+    def simplifyBinary(self, expr: Binary) -> Expr:
+        left, right = expr.left, expr.right
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            return self.fold(expr)
+        operator_type = expr.operator.type
+        # x + 0 is not an identity: -0 + 0 is 0
+        if operator_type in (TokenType.STAR, TokenType.SLASH):
+            if isLiteralNumber(right, 1.0) and isNumber(left):
+                return left
+        if operator_type == TokenType.STAR:
+            if isLiteralNumber(left, 1.0) and isNumber(right):
+                return right
+        if operator_type == TokenType.MINUS:
+            if isLiteralNumber(right, 0.0) and isNumber(left):
+                return left
+        return expr
+
+
+def isLiteralNumber(expr: Expr, value: float) -> bool:
+    return (
+        isinstance(expr, Literal)
+        and isinstance(expr.value, float)
+        and expr.value == value
+    )
+
+
+def isNumber(expr: Expr) -> bool:
+    """True if `expr` can only ever evaluate to a number (or raise)."""
+    # a chain of `+` is checked with a work list, not recursion
+    work = [expr]
+    while work:
+        expr = work.pop()
+        if isinstance(expr, Grouping):
+            work.append(expr.expr)
+        elif isinstance(expr, Binary) and expr.operator.type == TokenType.PLUS:
+            work.append(expr.right)
+            work.append(expr.left)
+        elif isinstance(expr, Literal):
+            if not isinstance(expr.value, float):
+                return False
+        elif isinstance(expr, Unary):
+            if expr.operator.type != TokenType.MINUS:
+                return False
+        elif not (isinstance(expr, Binary) and expr.operator.type in NUMBER_RESULT_OPERATORS):
+            return False
+    return True
+
+
+def isBoolean(expr: Expr) -> bool:
+    """True if `expr` can only ever evaluate to a boolean (or raise)."""
+    while isinstance(expr, Grouping):
+        expr = expr.expr
+    if isinstance(expr, Literal):
+        return isinstance(expr.value, bool)
+    if isinstance(expr, Unary):
+        return expr.operator.type == TokenType.BANG
+    if isinstance(expr, Binary):
+        return expr.operator.type in BOOLEAN_RESULT_OPERATORS
+    return False
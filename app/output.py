@@ -0,0 +1,60 @@
+import sys
+from typing import TextIO
+
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class OutputSink:
+    """Destination for everything a program prints, one line at a time."""
+
+    def write_line(self, line: str) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+class StreamSink(OutputSink):
+    """Writes lines to a text stream, batching them into one write call.
+
+    Lines are buffered until roughly `buffer_size` characters are pending;
+    `buffer_size=0` writes every line straight through. Callers must `flush`
+    before exiting, including on error paths.
+    """
+
+    def __init__(self, stream: TextIO = None, buffer_size: int = 0):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.pending: list[str] = []
+        self.pending_size = 0
+
+    def write_line(self, line: str) -> None:
+        if not self.buffer_size:
+            self.stream.write(line + "\n")
+            return
+        self.pending.append(line)
+        self.pending_size += len(line) + 1
+        if self.pending_size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.pending.append("")
+            self.stream.write("\n".join(self.pending))
+            self.pending = []
+            self.pending_size = 0
+        self.stream.flush()
+
+
+class MemorySink(OutputSink):
+    """Collects output in memory, for embedding and tests."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def write_line(self, line: str) -> None:
+        self.lines.append(line)
+
+    def getvalue(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
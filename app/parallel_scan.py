@@ -0,0 +1,74 @@
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from app.scanner import TokenArray, scan_arrays
+
+
+# sources shorter than this are scanned serially: a pool costs more to start
+# than scanning a few hundred kilobytes takes
+PARALLEL_THRESHOLD = 1 << 20
+# chunks per worker, so one slow chunk does not leave the others idle
+CHUNKS_PER_JOB = 4
+
+# strings (terminated or not) and `//` comments are matched whole, so the
+# newlines this finds on their own are the ones outside of both
+SAFE_NEWLINE = re.compile(r'"[^"]*"?|//[^\n]*|\n')
+
+
+def split_points(source: str, parts: int) -> list[int]:
+    """Offsets that cut `source` into about `parts` equal chunks.
+
+    Each cut is just after a newline that is not inside a string literal or a
+    `//` comment; every token and skipped run ends before such a newline, so
+    the chunks scan to exactly the tokens of the whole source.
+    """
+    step = len(source) // parts
+    if not step:
+        return []
+    cuts = []
+    target = step
+    for match in SAFE_NEWLINE.finditer(source):
+        end = match.end()
+        if end > target and match.group() == "\n":
+            cuts.append(end)
+            if len(cuts) == parts - 1:
+                break
+            target = max(target + step, end)
+    return cuts
+
+
+def _scan_chunk(chunk: str, offset: int) -> tuple:
+    return scan_arrays(chunk, offset)
+
+
+def tokenize_parallel(
+    source: str, jobs: int = None, threshold: int = PARALLEL_THRESHOLD, line: int = 1
+) -> TokenArray:
+    """Scan `source` into a `TokenArray` using a pool of worker processes.
+
+    The source is cut at safe newlines, each chunk is scanned in a worker
+    with its offsets shifted to where it starts, and the parent concatenates
+    the arrays. Line numbers come from the parent's line index and scan
+    errors are reported in source order, so the result and stderr match
+    `TokenArray(source, line)` exactly. Sources under `threshold` characters,
+    and runs with a single job, are scanned serially.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs < 2 or len(source) < threshold:
+        return TokenArray(source, line)
+    cuts = split_points(source, jobs * CHUNKS_PER_JOB)
+    if not cuts:
+        return TokenArray(source, line)
+    bounds = [0, *cuts, len(source)]
+    starts = bounds[:-1]
+    chunks = [source[start:end] for start, end in zip(starts, bounds[1:])]
+    types, offsets, ends, errors = array("B"), array("I"), array("I"), []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for part in pool.map(_scan_chunk, chunks, starts):
+            types.extend(part[0])
+            offsets.extend(part[1])
+            ends.extend(part[2])
+            errors.extend(part[3])
+    return TokenArray(source, line, (types, offsets, ends, errors))
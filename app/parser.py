@@ -1,5 +1,6 @@
-from app.scanner import Token, TokenType
-from typing import Any
+from app.scanner import Token, TokenType, EOF
+from app.diagnostics import diagnostics, TRACE
+from typing import Any, Iterable
 import sys
 from app.ast import (
     Expr,
@@ -32,10 +33,63 @@ def create_error(token: Token, msg: str):
     return ParseError(msg)
 
 
+# Pratt parse table: TokenType -> (prefix kind, infix kind, infix precedence).
+PREC_NONE = 0
+PREC_ASSIGNMENT = 1
+PREC_EQUALITY = 2
+PREC_COMPARISON = 3
+PREC_TERM = 4
+PREC_FACTOR = 5
+PREC_UNARY = 6
+
+PREFIX_LITERAL = "literal"
+PREFIX_VARIABLE = "variable"
+PREFIX_UNARY = "unary"
+PREFIX_GROUPING = "grouping"
+INFIX_BINARY = "binary"
+INFIX_ASSIGN = "assign"
+
+RULES = {
+    TokenType.LEFT_PAREN: (PREFIX_GROUPING, None, PREC_NONE),
+    TokenType.MINUS: (PREFIX_UNARY, INFIX_BINARY, PREC_TERM),
+    TokenType.PLUS: (None, INFIX_BINARY, PREC_TERM),
+    TokenType.SLASH: (None, INFIX_BINARY, PREC_FACTOR),
+    TokenType.STAR: (None, INFIX_BINARY, PREC_FACTOR),
+    TokenType.BANG: (PREFIX_UNARY, None, PREC_NONE),
+    TokenType.BANG_EQUAL: (None, INFIX_BINARY, PREC_EQUALITY),
+    TokenType.EQUAL_EQUAL: (None, INFIX_BINARY, PREC_EQUALITY),
+    TokenType.GREATER: (None, INFIX_BINARY, PREC_COMPARISON),
+    TokenType.GREATER_EQUAL: (None, INFIX_BINARY, PREC_COMPARISON),
+    TokenType.LESS: (None, INFIX_BINARY, PREC_COMPARISON),
+    TokenType.LESS_EQUAL: (None, INFIX_BINARY, PREC_COMPARISON),
+    TokenType.EQUAL: (None, INFIX_ASSIGN, PREC_ASSIGNMENT),
+    TokenType.IDENTIFIER: (PREFIX_VARIABLE, None, PREC_NONE),
+    TokenType.STRING: (PREFIX_LITERAL, None, PREC_NONE),
+    TokenType.NUMBER: (PREFIX_LITERAL, None, PREC_NONE),
+    TokenType.NIL: (PREFIX_LITERAL, None, PREC_NONE),
+    TokenType.TRUE: (PREFIX_LITERAL, None, PREC_NONE),
+    TokenType.FALSE: (PREFIX_LITERAL, None, PREC_NONE),
+}
+
+# keyword literals carry no token value
+LITERAL_VALUES = {TokenType.TRUE: True, TokenType.FALSE: False, TokenType.NIL: None}
+
+# pending-operator kinds on the expression stack
+FRAME_BINARY = "binary"
+FRAME_UNARY = "unary"
+FRAME_GROUPING = "grouping"
+FRAME_ASSIGN = "assign"
+
+
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
+    def __init__(self, tokens: Iterable[Token]):
+        # tokens are pulled one at a time through a one-token lookahead, so
+        # a lazy TokenStream can be parsed without materializing it
+        self.tokens = iter(tokens)
         self.current = 0
+        self.last = None
+        self.lookahead = next(self.tokens, None)
+        self.trace = diagnostics.enabled("parser", TRACE)
 
     def parse_statements(self):
         try:
@@ -81,11 +135,22 @@ class Parser:
         return self.expression_statement()
 
     def block(self):
+        # nested blocks are kept on a stack rather than parsed recursively
         statements = []
-        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
-            statements.append(self.declaration())
-        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
-        return Block(statements)
+        enclosing = []
+        while True:
+            if self.match(TokenType.LEFT_BRACE):
+                enclosing.append(statements)
+                statements = []
+            elif self.check(TokenType.RIGHT_BRACE) or self.is_at_end():
+                self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+                block = Block(statements)
+                if not enclosing:
+                    return block
+                statements = enclosing.pop()
+                statements.append(block)
+            else:
+                statements.append(self.declaration())
 
     def print_statement(self):
         value = self.expression()
@@ -98,91 +163,79 @@ class Parser:
         return Expression(expr)
 
     def expression(self):
-        return self.assignment()
-
-    def assignment(self):
-        expr = self.equality()
-        print(f"in assignment: {expr}", file=sys.stderr)
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            # assignment is right associative, we instead recursively call assignment to parse the rhs
-            value = self.assignment()
-
-            # the lhs can be a complex expression, ie.
-            #  newPoint(x + 2, 0).y = 3;
-            # The lhs can very well be a valid expression, ie. just
-            #  newPoint(x + 2, 0).y
-            # So we parse the lhs as an expression and then after the fact product a syntax tree
-            #  that turns it into an assignment target.
-            # If the lhs isn't a valid assignment target, then we'll fail with syntax error.
-            #   ie. such as `a + b = c;`
-            if isinstance(expr, Variable):
-                name = expr.name
-                print(f"in assignment: {name}, {value}", file=sys.stderr)
-                return Assignment(name, value)
-            raise create_error(equals, "Invalid assignment target.")
-        return expr
-
-    def equality(self):
-        expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def comparison(self):
-        expr = self.term()
-        while self.match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def term(self):
-        expr = self.factor()
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def factor(self):
-        expr = self.unary()
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def unary(self):
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.primary()
-
-    def primary(self):
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        elif self.match(TokenType.FALSE):
-            return Literal(False)
-        elif self.match(TokenType.NUMBER, TokenType.STRING, TokenType.NIL):
-            # print(f"in literal {self.previous().value}")
-            return Literal(self.previous().value)
-        elif self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-        raise create_error(self.peek(), "Expect expression.")
+        """Precedence climbing driven by `RULES`, without recursion.
+
+        Operators whose operand is still being parsed wait on an explicit
+        stack, each with the minimum precedence its context allowed before
+        it was pushed, so nesting depth is bounded by memory rather than
+        Python's recursion limit.
+        """
+        stack = []
+        min_precedence = PREC_ASSIGNMENT
+        rules = RULES.get
+        tokens = self.tokens
+        while True:
+            # prefix position: an operand, possibly behind unary operators
+            # and opening parentheses
+            token = self.lookahead
+            if token is None:
+                token = self.peek()
+            rule = rules(token.type)
+            if rule is None or rule[0] is None:
+                raise create_error(token, "Expect expression.")
+            # same as self.advance(); token is known not to be EOF
+            self.current += 1
+            self.last = token
+            self.lookahead = next(tokens, None)
+            prefix = rule[0]
+            if prefix is PREFIX_UNARY:
+                stack.append((FRAME_UNARY, token, None, min_precedence))
+                min_precedence = PREC_UNARY
+                continue
+            if prefix is PREFIX_GROUPING:
+                stack.append((FRAME_GROUPING, token, None, min_precedence))
+                min_precedence = PREC_ASSIGNMENT
+                continue
+            if prefix is PREFIX_LITERAL:
+                expr = Literal(LITERAL_VALUES.get(token.type, token.value))
+            else:
+                expr = Variable(token)
+
+            # infix position: either push the next operator or finish the
+            # innermost pending frame with `expr` as its last operand
+            while True:
+                token = self.lookahead
+                rule = rules(token.type) if token is not None else None
+                if rule is not None and rule[1] is not None and rule[2] >= min_precedence:
+                    self.current += 1
+                    self.last = token
+                    self.lookahead = next(tokens, None)
+                    if rule[1] is INFIX_ASSIGN:
+                        # right associative: the value may itself be an assignment
+                        stack.append((FRAME_ASSIGN, expr, token, min_precedence))
+                        min_precedence = PREC_ASSIGNMENT
+                    else:
+                        stack.append((FRAME_BINARY, expr, token, min_precedence))
+                        min_precedence = rule[2] + 1
+                    break
+                if not stack:
+                    return expr
+                kind, left, operator, min_precedence = stack.pop()
+                if kind is FRAME_BINARY:
+                    expr = Binary(left, operator, expr)
+                elif kind is FRAME_UNARY:
+                    expr = Unary(left, expr)
+                elif kind is FRAME_GROUPING:
+                    self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+                    expr = Grouping(expr)
+                else:
+                    # the target was parsed as an ordinary expression; only a
+                    # plain variable can be assigned to (`a + b = c` is an error)
+                    if not isinstance(left, Variable):
+                        raise create_error(operator, "Invalid assignment target.")
+                    if self.trace:
+                        diagnostics.log("parser", f"in assignment: {left.name}, {expr}")
+                    expr = Assignment(left.name, expr)
 
     def synchronize(self):
         self.advance()
@@ -215,18 +268,24 @@ class Parser:
         return self.peek().type == type
 
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self.last
 
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        if self.lookahead is None:
+            line = self.last.line if self.last is not None else 1
+            return EOF(line=line)
+        return self.lookahead
 
     def advance(self) -> Token:
         if not self.is_at_end():
             self.current += 1
+            self.last = self.lookahead
+            self.lookahead = next(self.tokens, None)
         return self.previous()
 
     def is_at_end(self):
-        return self.current >= len(self.tokens)
+        lookahead = self.lookahead
+        return lookahead is None or lookahead.type == TokenType.EOF
 
     def consume(self, type: TokenType, msg: str) -> Token:
         if self.check(type=type):
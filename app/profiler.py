@@ -0,0 +1,139 @@
+import time
+from typing import Any, Optional
+from app.ast import (
+    Expr,
+    Stmt,
+    Unary,
+    Binary,
+    Grouping,
+    Print,
+    Expression,
+    Variable,
+    VariableDeclaration,
+    Assignment,
+    Block,
+)
+from app.interpreter import Interpreter
+from app.output import OutputSink
+
+
+class NodeStats:
+    __slots__ = ("count", "total", "self_time")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.self_time = 0.0
+
+
+def node_line(node: Any) -> Optional[int]:
+    """Source line of the first token under `node`, if it has any."""
+    if isinstance(node, Binary):
+        return node_line(node.left) or node.operator.line
+    if isinstance(node, Unary):
+        return node.operator.line
+    if isinstance(node, (Variable, Assignment, VariableDeclaration)):
+        return node.name.line
+    if isinstance(node, (Grouping, Print, Expression)):
+        return node_line(node.expr)
+    if isinstance(node, Block):
+        for stmt in node.statements:
+            line = node_line(stmt)
+            if line is not None:
+                return line
+    return None
+
+
+class ProfilingInterpreter(Interpreter):
+    """Tree-walking interpreter that times every node it executes.
+
+    Time is attributed per AST node type and per source line; nodes without a
+    token of their own (literals, groupings) are charged to the line of the
+    enclosing node, and `?` when no enclosing node has one either (e.g.
+    `print 1;`). Self time excludes time spent in child nodes. Kept as a
+    subclass so the plain `Interpreter` pays nothing for it.
+    """
+
+    def __init__(self, output: OutputSink = None):
+        super().__init__(output)
+        self.by_type: dict[str, NodeStats] = {}
+        self.by_line: dict[Optional[int], NodeStats] = {}
+        # collapsed call stack -> accumulated self time
+        self.stacks: dict[str, float] = {}
+        self.frames: list[str] = []
+        self.child_time: list[float] = [0.0]
+        self.lines: list[Optional[int]] = [None]
+        self.line_cache: dict[int, Optional[int]] = {}
+
+    def evaluate(self, stmt: Stmt):
+        # expressions are recorded once, when evaluate hands them to visit
+        if isinstance(stmt, Expr):
+            return self.visit(stmt)
+        return self.profile(stmt, super().evaluate)
+
+    def visit(self, expr: Expr):
+        return self.profile(expr, super().visit)
+
+    def profile(self, node: Any, run):
+        key = id(node)
+        if key not in self.line_cache:
+            self.line_cache[key] = node_line(node)
+        line = self.line_cache[key] or self.lines[-1]
+        name = type(node).__name__
+        self.frames.append(f"{name}:{'?' if line is None else line}")
+        self.lines.append(line)
+        self.child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            return run(node)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.child_time.pop()
+            self.child_time[-1] += elapsed
+            self_time = elapsed - children
+            stats = self.by_type.get(name)
+            if stats is None:
+                stats = self.by_type[name] = NodeStats()
+            stats.count += 1
+            stats.total += elapsed
+            stats.self_time += self_time
+            stats = self.by_line.get(line)
+            if stats is None:
+                stats = self.by_line[line] = NodeStats()
+            stats.count += 1
+            stats.self_time += self_time
+            stack = ";".join(self.frames)
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + self_time
+            self.frames.pop()
+            self.lines.pop()
+
+    def report(self, limit: int = 10) -> list[str]:
+        total = sum(stats.self_time for stats in self.by_type.values()) or 1.0
+        lines = ["Profile by node type:"]
+        lines.append(f"  {'node':<22}{'count':>10}{'self ms':>12}{'total ms':>12}{'self %':>8}")
+        for name, stats in sorted(
+            self.by_type.items(), key=lambda item: item[1].self_time, reverse=True
+        ):
+            lines.append(
+                f"  {name:<22}{stats.count:>10}{stats.self_time * 1000:>12.3f}"
+                f"{stats.total * 1000:>12.3f}{stats.self_time / total * 100:>7.1f}%"
+            )
+        lines.append(f"Hottest lines (top {limit}):")
+        lines.append(f"  {'line':<22}{'count':>10}{'self ms':>12}{'':>12}{'self %':>8}")
+        for line, stats in sorted(
+            self.by_line.items(), key=lambda item: item[1].self_time, reverse=True
+        )[:limit]:
+            label = "?" if line is None else str(line)
+            lines.append(
+                f"  {label:<22}{stats.count:>10}{stats.self_time * 1000:>12.3f}"
+                f"{'':>12}{stats.self_time / total * 100:>7.1f}%"
+            )
+        return lines
+
+    def write_collapsed(self, path: str) -> None:
+        """Write `frame;frame;frame <microseconds>` lines for flamegraph tools."""
+        with open(path, "w") as file:
+            for stack, seconds in sorted(self.stacks.items()):
+                micros = int(round(seconds * 1_000_000))
+                if micros > 0:
+                    file.write(f"{stack} {micros}\n")
@@ -0,0 +1,86 @@
+import operator
+from collections import Counter
+from app.ast import Binary
+from app.interpreter import Interpreter
+from app.output import OutputSink
+from app.rope import Rope, concat
+from app.scanner import TokenType
+
+
+# (operator, left type, right type) -> operation that is exactly what
+# `Interpreter.binaryOperation` does for operands of those types
+SPECIALIZATIONS = {}
+for _operator_type, _fn in (
+    (TokenType.PLUS, operator.add),
+    (TokenType.MINUS, operator.sub),
+    (TokenType.STAR, operator.mul),
+    (TokenType.SLASH, operator.truediv),
+    (TokenType.GREATER, operator.gt),
+    (TokenType.GREATER_EQUAL, operator.ge),
+    (TokenType.LESS, operator.lt),
+    (TokenType.LESS_EQUAL, operator.le),
+    (TokenType.EQUAL_EQUAL, operator.eq),
+    (TokenType.BANG_EQUAL, operator.ne),
+):
+    SPECIALIZATIONS[_operator_type, float, float] = _fn
+for _left_type in (str, Rope):
+    for _right_type in (str, Rope):
+        SPECIALIZATIONS[TokenType.PLUS, _left_type, _right_type] = concat
+        SPECIALIZATIONS[TokenType.EQUAL_EQUAL, _left_type, _right_type] = operator.eq
+        SPECIALIZATIONS[TokenType.BANG_EQUAL, _left_type, _right_type] = operator.ne
+SPECIALIZATIONS[TokenType.EQUAL_EQUAL, bool, bool] = operator.eq
+SPECIALIZATIONS[TokenType.BANG_EQUAL, bool, bool] = operator.ne
+
+# `Binary.quick` after a failed guard: the node stays on the generic path
+DEOPTIMIZED = False
+
+
+class QuickeningInterpreter(Interpreter):
+    """Tree-walking interpreter whose `Binary` nodes specialize themselves.
+
+    The first execution of a `Binary` takes the generic path and records the
+    operand types in `node.quick` as `(left type, right type, operation)`
+    when a specialization exists for them. Later executions check the two
+    types and call the operation directly, skipping the operator dispatch and
+    number checks. If the guard fails the node deoptimizes for good and uses
+    the generic path from then on. `specialized` and `deoptimized` count
+    both by operator and operand types.
+    """
+
+    def __init__(self, output: OutputSink = None):
+        super().__init__(output)
+        self.specialized: Counter = Counter()
+        self.deoptimized: Counter = Counter()
+
+    def visitBinaryExpression(self, expr: Binary):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        quick = expr.quick
+        if quick:
+            left_type, right_type, operation = quick
+            if type(left) is left_type and type(right) is right_type:
+                return operation(left, right)
+            expr.quick = DEOPTIMIZED
+            self.deoptimized[self.describe(expr, left_type, right_type)] += 1
+        elif quick is None:
+            key = (expr.operator.type, type(left), type(right))
+            operation = SPECIALIZATIONS.get(key)
+            if operation is not None:
+                expr.quick = (key[1], key[2], operation)
+                self.specialized[self.describe(expr, key[1], key[2])] += 1
+            else:
+                expr.quick = DEOPTIMIZED
+        return self.binaryOperation(expr.operator.type, left, right)
+
+    def describe(self, expr: Binary, left_type: type, right_type: type) -> str:
+        return f"{left_type.__name__} {expr.operator.lexeme} {right_type.__name__}"
+
+    def report(self) -> list[str]:
+        lines = [
+            f"Quickening: {sum(self.specialized.values())} nodes specialized, "
+            f"{sum(self.deoptimized.values())} deoptimized"
+        ]
+        for name, count in self.specialized.most_common():
+            deopts = self.deoptimized[name]
+            lines.append(f"  {name:<22}{count:>10} specialized{deopts:>10} deoptimized")
+        return lines
@@ -0,0 +1,144 @@
+import sys
+from typing import Any, TextIO
+
+from app.ast import Expression
+from app.interpreter import Interpreter, EvaluationError
+from app.optimizer import Optimizer
+from app.output import OutputSink
+from app.parser import Parser, ParseError
+from app.resolver import Resolver, ResolveError
+from app.scanner import TokenArray, TokenType, scan_spans
+from app.utils import stringify
+
+
+PROMPT = "> "
+CONTINUATION_PROMPT = "... "
+
+NESTING = {
+    TokenType.LEFT_BRACE: 1,
+    TokenType.LEFT_PAREN: 1,
+    TokenType.RIGHT_BRACE: -1,
+    TokenType.RIGHT_PAREN: -1,
+}
+
+
+def is_complete(source: str) -> bool:
+    """False while `source` ends inside a string or an unclosed `{` or `(`."""
+    depth = 0
+    for type, start, end in scan_spans(source):
+        if type is None:
+            if source[start] == '"':
+                return False
+        else:
+            depth += NESTING.get(type, 0)
+    return depth <= 0
+
+
+class Repl:
+    """Read-eval-print loop over one long-lived tree-walking interpreter.
+
+    The interpreter's global `Environment` and the resolver's globals scope
+    persist between entries; each entry is scanned, parsed and resolved on
+    its own, so the work per entry does not grow with the session. An entry
+    that is a single expression statement also prints its value.
+    """
+
+    def __init__(self, output: OutputSink = None, options: dict[str, Any] = None):
+        self.interpreter = Interpreter(output)
+        self.output = self.interpreter.output
+        self.resolver = Resolver()
+        self.options = options or {}
+        # line number the next entry starts on, for error messages
+        self.line = 1
+        self.pending: list[str] = []
+
+    def feed(self, line: str) -> bool:
+        """Add a line of input; runs and returns True once it completes an entry."""
+        self.pending.append(line if line.endswith("\n") else line + "\n")
+        source = "".join(self.pending)
+        if not is_complete(source):
+            return False
+        self.pending = []
+        try:
+            self.execute(source)
+        finally:
+            self.line += source.count("\n")
+        return True
+
+    def execute(self, source: str) -> None:
+        tokens = TokenArray(source, self.line)
+        if tokens.has_error:
+            return
+        try:
+            stmts = Parser(tokens).parse_statements()
+        except ParseError:
+            return
+        if self.options.get("optimize"):
+            stmts = Optimizer().optimize(stmts)
+
+        globals_scope = self.resolver.scopes[0]
+        declared = dict(globals_scope)
+        try:
+            self.resolver.resolve(stmts)
+        except ResolveError:
+            # forget the globals this entry declared before failing
+            globals_scope.clear()
+            globals_scope.update(declared)
+            return
+
+        try:
+            if len(stmts) == 1 and isinstance(stmts[0], Expression):
+                value = self.interpreter.visit(stmts[0].expr)
+                self.output.write_line(stringify(value))
+            else:
+                self.interpreter.interpret(stmts)
+        except EvaluationError as e:
+            self.report(e.message)
+        except ArithmeticError as e:
+            # float division by zero raises from Python itself; the session
+            # survives it like any other runtime error
+            self.report("Division by zero." if isinstance(e, ZeroDivisionError) else str(e))
+        except RecursionError:
+            self.report("Expression nested too deeply.")
+        finally:
+            # a declaration cut short by an error still exists, as nil
+            values = self.interpreter.environment.values
+            if len(values) < len(globals_scope):
+                values.extend([None] * (len(globals_scope) - len(values)))
+
+    def report(self, message: str) -> None:
+        print(message, file=sys.stderr)
+        print(f"[line {self.line}]", file=sys.stderr)
+
+    def run(self, stdin: TextIO = None) -> None:
+        """Read entries until end of input; prompts only when stdin is a terminal."""
+        stdin = stdin if stdin is not None else sys.stdin
+        interactive = stdin.isatty()
+        if interactive:
+            try:
+                import readline  # noqa: F401  (line editing and history for input())
+            except ImportError:
+                pass
+        while True:
+            try:
+                if interactive:
+                    line = input(CONTINUATION_PROMPT if self.pending else PROMPT)
+                else:
+                    line = stdin.readline()
+                    if not line:
+                        break
+                self.feed(line)
+            except EOFError:
+                break
+            except KeyboardInterrupt:
+                # Ctrl-C drops the entry being typed or stops the one running
+                self.pending = []
+                print("\nKeyboardInterrupt", file=sys.stderr)
+            finally:
+                self.output.flush()
+        if self.pending:
+            # input ended mid-entry; let the parser report what is missing
+            source = "".join(self.pending)
+            self.pending = []
+            self.execute(source)
+            self.output.flush()
@@ -0,0 +1,123 @@
+import sys
+from app.ast import (
+    Expr,
+    Literal,
+    Grouping,
+    Unary,
+    Binary,
+    Print,
+    Expression,
+    Stmt,
+    Variable,
+    VariableDeclaration,
+    Assignment,
+    Block,
+)
+from app.scanner import Token
+
+
+# markers on the walk stack
+END_SCOPE = object()
+DECLARE = "declare"
+LOOKUP = "lookup"
+
+
+class ResolveError(Exception):
+    def __init__(self, m):
+        self.message = m
+
+    def __str__(self):
+        return self.message
+
+
+class Resolver:
+    """Static pass run between parsing and interpretation.
+
+    Tags every `Variable` and `Assignment` with the number of frames to hop
+    (`depth`) and the index into that frame (`slot`), and every
+    `VariableDeclaration` with the slot it defines. Scopes mirror the
+    `Environment` frames the interpreter creates: the globals scope at the
+    bottom and one scope per `Block`. The globals scope persists across
+    `resolve` calls so statements can be fed in incrementally.
+    """
+
+    def __init__(self):
+        self.scopes: list[dict[str, int]] = [{}]
+
+    def resolve(self, stmts: list[Stmt]) -> list[Stmt]:
+        self.walk([stmt for stmt in reversed(stmts) if stmt])
+        return stmts
+
+    def undefined(self, name: Token) -> ResolveError:
+        msg = f"Undefined variable '{name.lexeme}'."
+        print(msg, file=sys.stderr)
+        print(f"[line {name.line}]", file=sys.stderr)
+        return ResolveError(msg)
+
+    def declare(self, name: Token) -> int:
+        scope = self.scopes[-1]
+        # redeclaring a name in the same scope reuses its slot
+        if name.lexeme not in scope:
+            scope[name.lexeme] = len(scope)
+        return scope[name.lexeme]
+
+    def lookup(self, name: Token) -> (int, int):
+        innermost = len(self.scopes) - 1
+        for i in range(innermost, -1, -1):
+            slot = self.scopes[i].get(name.lexeme)
+            if slot is not None:
+                return innermost - i, slot
+        raise self.undefined(name)
+
+    def resolveStatement(self, stmt: Stmt) -> None:
+        self.walk([stmt])
+
+    def resolveExpression(self, expr: Expr) -> None:
+        self.walk([expr])
+
+    def walk(self, work: list) -> None:
+        """Resolve the nodes on `work`, last one first, with an explicit stack.
+
+        Nodes are visited in evaluation order without recursing, so a deeply
+        nested program cannot exhaust the Python stack.
+        """
+        depth = len(self.scopes)
+        try:
+            while work:
+                node = work.pop()
+                if node is END_SCOPE:
+                    self.scopes.pop()
+                elif isinstance(node, tuple):
+                    kind, node = node
+                    if kind is DECLARE:
+                        node.slot = self.declare(node.name)
+                    else:
+                        node.depth, node.slot = self.lookup(node.name)
+                elif isinstance(node, Literal):
+                    continue
+                elif isinstance(node, Binary):
+                    work.append(node.right)
+                    work.append(node.left)
+                elif isinstance(node, Variable):
+                    node.depth, node.slot = self.lookup(node.name)
+                elif isinstance(node, (Grouping, Print, Expression)):
+                    work.append(node.expr)
+                elif isinstance(node, Unary):
+                    work.append(node.right)
+                elif isinstance(node, Assignment):
+                    work.append((LOOKUP, node))
+                    work.append(node.value)
+                elif isinstance(node, VariableDeclaration):
+                    # resolve the initializer first so `var a = a;` sees the outer `a`
+                    work.append((DECLARE, node))
+                    if node.initializer is not None:
+                        work.append(node.initializer)
+                elif isinstance(node, Block):
+                    self.scopes.append({})
+                    work.append(END_SCOPE)
+                    work.extend(reversed(node.statements))
+                else:
+                    raise ValueError(f"Unexpected node type: {type(node)}")
+        finally:
+            # an error leaves the scopes as they were before the walk
+            del self.scopes[depth:]
@@ -0,0 +1,66 @@
+from typing import Union
+
+
+# Concatenations shorter than this are plain `str` copies; only longer results
+# become ropes, so small strings pay nothing and every rope is non-empty.
+ROPE_THRESHOLD = 256
+
+
+class Rope:
+    """A Lox string built by `+`, kept as an unflattened concatenation.
+
+    Concatenating is O(1): the rope just points at its two operands (each a
+    `str` or another `Rope`). The characters are joined the first time the
+    value is observed (`str()`, printing, equality) and cached, and the
+    operand references are dropped so the pieces can be freed.
+    """
+
+    __slots__ = ("left", "right", "length", "flat")
+
+    def __init__(self, left: "LoxString", right: "LoxString"):
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.flat = None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            # explicit stack: ropes built in a loop are as deep as the loop is long
+            parts = []
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                if type(node) is str:
+                    parts.append(node)
+                elif node.flat is not None:
+                    parts.append(node.flat)
+                else:
+                    stack.append(node.right)
+                    stack.append(node.left)
+            self.flat = "".join(parts)
+            self.left = self.right = None
+        return self.flat
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        # different lengths never need flattening
+        return self.length == len(other) and str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+LoxString = Union[str, Rope]
+STRING_TYPES = (str, Rope)
+
+
+def concat(left: LoxString, right: LoxString) -> LoxString:
+    """`left + right` for two Lox strings."""
+    if len(left) + len(right) < ROPE_THRESHOLD:
+        # neither operand can be a rope: ropes are at least ROPE_THRESHOLD long
+        return left + right
+    return Rope(left, right)
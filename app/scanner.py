@@ -1,9 +1,15 @@
+import re
 import sys
 
+from array import array
+from bisect import bisect_left, bisect_right
 from enum import Enum, auto
+from itertools import accumulate
 from typing import Any
 from functools import partial
 
+from app.diagnostics import diagnostics
+
 class TokenType(Enum):
     LEFT_PAREN = auto()
     LEFT_BRACE = auto()
@@ -48,11 +54,17 @@ class TokenType(Enum):
     TRUE = auto()
     VAR = auto()
     WHILE = auto()
-    
+
+    # members are singletons, so identity hashing is equivalent to Enum's
+    # name-based __hash__ and keeps the parser's dict lookups in C
+    __hash__ = object.__hash__
+
     def __str__(self):
         return self.name
 
 class Token:
+    __slots__ = ("type", "lexeme", "value", "line")
+
     def __init__(self, type: TokenType, lexeme: str, value: Any, line: int):
         self.type = type
         self.lexeme = lexeme
@@ -72,215 +84,415 @@ class Token:
         return len(self.lexeme)
     
 EOF = partial(Token, type=TokenType.EOF, lexeme="", value=None)
-LPAREN = partial(Token, type=TokenType.LEFT_PAREN, lexeme="(", value=None)
-RPAREN = partial(Token, type=TokenType.RIGHT_PAREN, lexeme=")", value=None)
-LBRACE = partial(Token, type=TokenType.LEFT_BRACE, lexeme="{", value=None)
-RBRACE = partial(Token, type=TokenType.RIGHT_BRACE, lexeme="}", value=None)
-DOT = partial(Token, type=TokenType.DOT, lexeme=".", value=None)
-COMMA = partial(Token, type=TokenType.COMMA, lexeme=",", value=None)
-PLUS = partial(Token, type=TokenType.PLUS, lexeme="+", value=None)
-STAR = partial(Token, type=TokenType.STAR, lexeme="*", value=None)
-MINUS = partial(Token, type=TokenType.MINUS, lexeme="-", value=None)
-SEMICOLON = partial(Token, type=TokenType.SEMICOLON, lexeme=";", value=None)
-EQUAL = partial(Token, type=TokenType.EQUAL, lexeme="=", value=None)
-EQUAL_EQUAL = partial(Token, type=TokenType.EQUAL_EQUAL, lexeme="==", value=None)
-BANG = partial(Token, type=TokenType.BANG, lexeme="!", value=None)
-BANG_EQUAL = partial(Token, type=TokenType.BANG_EQUAL, lexeme="!=", value=None)
-LESS = partial(Token, type=TokenType.LESS, lexeme="<", value=None)
-LESS_EQUAL = partial(Token, type=TokenType.LESS_EQUAL, lexeme="<=", value=None)
-GREATER = partial(Token, type=TokenType.GREATER, lexeme=">", value=None)
-GREATER_EQUAL = partial(Token, type=TokenType.GREATER_EQUAL, lexeme=">=", value=None)
-SLASH = partial(Token, type=TokenType.SLASH, lexeme="/", value=None)
-SLASH_SLASH = partial(Token, type=TokenType.SLASH_SLASH, lexeme="//", value=None)
-SPACE = partial(Token, type=TokenType.SPACE, lexeme=" ", value=None)
-TAB = partial(Token, type=TokenType.TAB, lexeme="\t", value=None)
-NEWLINE = partial(Token, type=TokenType.NEWLINE, lexeme="\n", value=None)
-AND = partial(Token, type=TokenType.AND, lexeme="and", value=None)
-CLASS = partial(Token, type=TokenType.CLASS, lexeme="class", value=None)
-ELSE = partial(Token, type=TokenType.ELSE, lexeme="else", value=None)
-FALSE = partial(Token, type=TokenType.FALSE, lexeme="false", value=None)    
-FUN = partial(Token, type=TokenType.FUN, lexeme="fun", value=None)
-FOR = partial(Token, type=TokenType.FOR, lexeme="for", value=None)
-IF = partial(Token, type=TokenType.IF, lexeme="if", value=None)
-NIL = partial(Token, type=TokenType.NIL, lexeme="nil", value=None)
-OR = partial(Token, type=TokenType.OR, lexeme="or", value=None)
-PRINT = partial(Token, type=TokenType.PRINT, lexeme="print", value=None)
-RETURN = partial(Token, type=TokenType.RETURN, lexeme="return", value=None)
-SUPER = partial(Token, type=TokenType.SUPER, lexeme="super", value=None)
-THIS = partial(Token, type=TokenType.THIS, lexeme="this", value=None)
-TRUE = partial(Token, type=TokenType.TRUE, lexeme="true", value=None)
-VAR = partial(Token, type=TokenType.VAR, lexeme="var", value=None)
-WHILE = partial(Token, type=TokenType.WHILE, lexeme="while", value=None)
+
+PUNCTUATION = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ".": TokenType.DOT,
+    ",": TokenType.COMMA,
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.STAR,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
 
 RESERVED_WORDS_MAP = {
-    "and": AND,
-    "class": CLASS,
-    "else": ELSE,
-    "false": FALSE,
-    "fun": FUN,
-    "for": FOR,
-    "if": IF,
-    "nil": NIL,
-    "or": OR,
-    "print": PRINT,
-    "return": RETURN,
-    "super": SUPER,
-    "this": THIS,
-    "true": TRUE,
-    "var": VAR,
-    "while": WHILE,
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "fun": TokenType.FUN,
+    "for": TokenType.FOR,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE,
 }
 
 
 RESERVED_WORDS = RESERVED_WORDS_MAP.keys()
 
+# One match = any run of whitespace/comments followed by at most one token.
+# The token alternatives are tried in order, so a '"' without a closing quote
+# and any other stray character fall through to ERROR.
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<SKIP>(?:[ \t\r\n]+|//[^\n]*)*)
+    (?:
+        (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+      | (?P<IDENTIFIER>[^\W\d]\w*)
+      | (?P<STRING>"[^"]*")
+      | (?P<PUNCTUATION>[!=<>]=?|[(){},.+\-*;/])
+      | (?P<ERROR>"[^"]*|.)
+    )?
+    """,
+    re.VERBOSE,
+)
 
-class UnterminatedStringError(Exception):
-    pass
-
-def parse_string(src_str: str, cur_idx: int, line_idx: int) -> Token:
-    str_start_idx = cur_idx
-    str_end_idx = cur_idx + 1
-    max_idx = len(src_str)
-    while str_end_idx < max_idx and src_str[str_end_idx] != '"':
-        # if src_str[str_end_idx] == "\n":
-        #   raise UnterminatedStringError("Unterminated string. newline encountered in the string")
-        str_end_idx += 1
-    if str_end_idx >= max_idx:
-        raise UnterminatedStringError("Unterminated string.")
-    lexeme = src_str[str_start_idx:str_end_idx+1]
-    value = src_str[str_start_idx+1:str_end_idx]
-    str_token = Token(type=TokenType.STRING, lexeme=lexeme, value=value, line=line_idx)
-    return str_token
-
-def parse_number(src_str: str, cur_idx: int, line_idx: int) -> Token:
-    num_start_idx = cur_idx
-    num_end_idx = cur_idx + 1
-    dot_idx = -1
-    while num_end_idx < len(src_str) and (src_str[num_end_idx].isdigit() or src_str[num_end_idx] == "."):
-        if src_str[num_end_idx] == ".":
-            if dot_idx != -1:
-                raise Exception("Invalid number. Multiple dots in the number.")
-            dot_idx = num_end_idx
-        num_end_idx += 1
-    if dot_idx == num_end_idx - 1:
-        num_end_idx -= 1
-    lexeme = src_str[num_start_idx:num_end_idx]
-    value = float(lexeme)
-    return Token(type=TokenType.NUMBER, lexeme=lexeme, value=value, line=line_idx)
-
-def parse_identifier(src_str: str, cur_idx: int, line_idx: int) -> Token:
-    id_start_idx = cur_idx
-    id_end_idx = cur_idx + 1
-    while id_end_idx < len(src_str) and (src_str[id_end_idx].isalnum() or src_str[id_end_idx] == "_"):
-        id_end_idx += 1
-    lexeme = src_str[id_start_idx:id_end_idx]
-    return Token(type=TokenType.IDENTIFIER, lexeme=lexeme, value=None, line=line_idx)
-
-def matches_reserved_word(src_str: str, cur_idx: int, line_idx: int) -> str:
-    for word in RESERVED_WORDS:
-        # Handle identifiers that have reserved words as prefixes.
-        # ie: or vs orchid. Or is a reserved word, orchid is an identifier.
-        if src_str[cur_idx:cur_idx+len(word)] == word and \
-        (cur_idx + len(word) == len(src_str) or not src_str[cur_idx + len(word)].isalnum()):
-            return word
-    return ""
-
-def next_token(src_str: str, cur_idx: int, line_idx: int) -> Token:
-    char = src_str[cur_idx]
-    if char == "(":
-        return LPAREN(line=line_idx)
-    elif char == ")":
-        return RPAREN(line=line_idx)
-    elif char == "{":
-        return LBRACE(line=line_idx)
-    elif char == "}":
-        return RBRACE(line=line_idx)
-    elif char == ".":
-        return DOT(line=line_idx)
-    elif char == ",":
-        return COMMA(line=line_idx)
-    elif char == "+":
-        return PLUS(line=line_idx)
-    elif char == "-":
-        return MINUS(line=line_idx)
-    elif char == "*":
-        return STAR(line=line_idx)
-    elif char == ";":
-        return SEMICOLON(line=line_idx)
-    elif char == "=":
-        if cur_idx + 1 < len(src_str) and src_str[cur_idx + 1] == "=":
-            return EQUAL_EQUAL(line=line_idx)
+
+def error_message(src_str: str, start: int) -> str:
+    if src_str[start] == '"':
+        return "Unterminated string."
+    return f"Unexpected character: {src_str[start]}"
+
+
+def scan_spans(src_str: str, start: int = 0, final: bool = True):
+    """Yield `(type, start, end)` for every token in `src_str[start:]`.
+
+    `type` is None for a scan error; `error_message` describes it. With
+    `final=False` the source is treated as a prefix of a longer input and
+    scanning stops before any token that might continue past the end (a
+    NUMBER needs two characters of lookahead), so the caller can resume from
+    the end of the last span once more text is available.
+    """
+    length = len(src_str)
+    for m in TOKEN_PATTERN.finditer(src_str, start):
+        kind = m.lastgroup
+        if not final and m.end() + 1 >= length:
+            return
+        if kind == "SKIP":
+            return
+        tok_start, tok_end = m.span(kind)
+        if kind == "IDENTIFIER":
+            yield RESERVED_WORDS_MAP.get(
+                src_str[tok_start:tok_end], TokenType.IDENTIFIER
+            ), tok_start, tok_end
+        elif kind == "PUNCTUATION":
+            yield PUNCTUATION[src_str[tok_start:tok_end]], tok_start, tok_end
+        elif kind == "ERROR":
+            yield None, tok_start, tok_end
         else:
-            return EQUAL(line=line_idx)
-    elif char == "!":
-        if cur_idx + 1 < len(src_str) and src_str[cur_idx + 1] == "=":
-            return BANG_EQUAL(line=line_idx)
+            yield TokenType[kind], tok_start, tok_end
+
+
+def make_token(type: TokenType, lexeme: str, line_idx: int) -> Token:
+    if type == TokenType.NUMBER:
+        return Token(type, lexeme, float(lexeme), line_idx)
+    elif type == TokenType.STRING:
+        return Token(type, lexeme, lexeme[1:-1], line_idx)
+    return Token(type, lexeme, None, line_idx)
+
+
+def report_error(line_idx: int, message: str) -> None:
+    if diagnostics.enabled("scanner"):
+        diagnostics.log("scanner", message)
+    print(f"[line {line_idx}] Error: {message}", file=sys.stderr)
+
+
+CHUNK_SIZE = 1 << 16
+
+
+class TokenStream:
+    """Lazily tokenizes a text file, reading it in fixed-size chunks.
+
+    Tokens are yielded as soon as they are complete; a token that straddles a
+    chunk boundary is carried over and rescanned with the next chunk, so only
+    one chunk (plus that carry) is held in memory at a time. `has_error` is
+    set once iteration has seen a scan error.
+    """
+
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.has_error = False
+
+    def __iter__(self):
+        line_idx = 1
+        buffer = ""
+        while True:
+            chunk = self.file.read(self.chunk_size)
+            final = not chunk
+            buffer += chunk
+            count = buffer.count
+            last = 0
+            resume = 0
+            for type, start, end in scan_spans(buffer, 0, final):
+                line_idx += count("\n", last, start)
+                last = start
+                resume = end
+                if type is None:
+                    self.has_error = True
+                    report_error(
+                        line_idx + count("\n", start, end),
+                        error_message(buffer, start),
+                    )
+                    continue
+                yield make_token(type, buffer[start:end], line_idx)
+            if final:
+                line_idx += count("\n", last)
+                yield EOF(line=line_idx)
+                return
+            line_idx += count("\n", last, resume)
+            buffer = buffer[resume:]
+
+
+# TokenArray stores token types as indexes into this list
+TOKEN_TYPES = list(TokenType)
+TYPE_CODES = {type: code for code, type in enumerate(TOKEN_TYPES)}
+
+
+def scan_codes(source: str, start: int = 0, lazy: bool = False):
+    """Yield `(code, start, end)` for every token in `source[start:]`.
+
+    `code` indexes `TOKEN_TYPES`, or is None for a scan error spanning
+    `source[start:end]`. By default all matches are found up front, which is
+    fastest for a full scan; `lazy=True` finds them one at a time, for
+    callers that stop early.
+    """
+    reserved = RESERVED_CODES.get
+    punctuation = PUNCTUATION_CODES.__getitem__
+    IDENTIFIER = TYPE_CODES[TokenType.IDENTIFIER]
+    NUMBER = TYPE_CODES[TokenType.NUMBER]
+    STRING = TYPE_CODES[TokenType.STRING]
+    matches = (
+        map(re.Match.groups, TOKEN_PATTERN.finditer(source, start))
+        if lazy
+        else TOKEN_PATTERN.findall(source, start)
+    )
+    position = start
+    for skip, number, identifier, string, punct, error in matches:
+        position += len(skip)
+        if identifier:
+            code = reserved(identifier, IDENTIFIER)
+            lexeme = identifier
+        elif punct:
+            code = punctuation(punct)
+            lexeme = punct
+        elif number:
+            code = NUMBER
+            lexeme = number
+        elif string:
+            code = STRING
+            lexeme = string
+        elif error:
+            code = None
+            lexeme = error
         else:
-            return BANG(line=line_idx)
-    elif char == "<":
-        if cur_idx + 1 < len(src_str) and src_str[cur_idx + 1] == "=":
-            return LESS_EQUAL(line=line_idx)
+            continue
+        end = position + len(lexeme)
+        yield code, position, end
+        position = end
+
+
+def scan_arrays(source: str, offset: int = 0) -> tuple:
+    """Scan `source` into `(types, starts, ends, errors)` without an EOF entry.
+
+    Offsets are shifted by `offset`, so a slice of a larger text can be
+    scanned on its own; `errors` lists `(offset, message)` pairs in order.
+    """
+    types = array("B")
+    starts = array("I")
+    ends = array("I")
+    errors = []
+    add_type = types.append
+    add_start = starts.append
+    add_end = ends.append
+    for code, start, end in scan_codes(source):
+        if code is None:
+            errors.append((end + offset, error_message(source, start)))
+            continue
+        add_type(code)
+        add_start(start + offset)
+        add_end(end + offset)
+    return types, starts, ends, errors
+
+
+class TokenArray:
+    """The tokens of one source text, stored as parallel arrays.
+
+    `types` holds an index into `TOKEN_TYPES` per token and `starts`/`ends`
+    its offsets in `source`; the final entry is EOF. Lexemes and values are
+    sliced from the source on demand, and line numbers come from a binary
+    search of the line-start index, so the scan allocates no per-token
+    objects. Iterating yields `Token`s one at a time for the parser.
+    """
+
+    def __init__(self, source: str, line: int = 1, arrays: tuple = None, report: bool = True):
+        self.source = source
+        self.first_line = line
+        self.line_starts = array("I", [0])
+        self.line_starts.extend(
+            accumulate(len(part) + 1 for part in source.split("\n")[:-1])
+        )
+        # `arrays` is a finished scan of `source`, e.g. merged from chunks
+        self.types, self.starts, self.ends, self.errors = arrays or scan_arrays(source)
+        self.types.append(TYPE_CODES[TokenType.EOF])
+        self.starts.append(len(source))
+        self.ends.append(len(source))
+        self.has_error = bool(self.errors)
+        if report:
+            for offset, message in self.errors:
+                report_error(self.line_at(offset), message)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index] : self.ends[index]]
+
+    def value(self, index: int) -> Any:
+        type = TOKEN_TYPES[self.types[index]]
+        if type == TokenType.NUMBER:
+            return float(self.lexeme(index))
+        if type == TokenType.STRING:
+            return self.lexeme(index)[1:-1]
+        return None
+
+    def line_at(self, offset: int) -> int:
+        return bisect_right(self.line_starts, offset) + self.first_line - 1
+
+    def line(self, index: int) -> int:
+        return self.line_at(self.starts[index])
+
+    def column(self, index: int) -> int:
+        start = self.starts[index]
+        return start - self.line_starts[bisect_right(self.line_starts, start) - 1] + 1
+
+    def token(self, index: int) -> Token:
+        return Token(self.type(index), self.lexeme(index), self.value(index), self.line(index))
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, index: int):
+        """Yield `Token`s from the one at `index` through EOF."""
+        source = self.source
+        line_starts = self.line_starts
+        # index into line_starts of the next line; tokens are in order, so
+        # the line only needs looking up when a token starts past it
+        next_line = bisect_right(line_starts, self.starts[index]) if index else 1
+        next_start = line_starts[next_line] if next_line < len(line_starts) else len(source) + 1
+        line = self.first_line + next_line - 1
+        types = TOKEN_TYPES
+        NUMBER, STRING = TokenType.NUMBER, TokenType.STRING
+        codes, starts, ends = self.types, self.starts, self.ends
+        if index:
+            # index into the arrays: skipping or slicing costs the whole prefix
+            rows = ((codes[i], starts[i], ends[i]) for i in range(index, len(codes)))
         else:
-            return LESS(line=line_idx)
-    elif char == ">":
-        if cur_idx + 1 < len(src_str) and src_str[cur_idx + 1] == "=":
-            return GREATER_EQUAL(line=line_idx)
+            rows = zip(codes, starts, ends)
+        for code, start, end in rows:
+            if start >= next_start:
+                next_line = bisect_right(line_starts, start, next_line)
+                line = self.first_line + next_line - 1
+                next_start = (
+                    line_starts[next_line] if next_line < len(line_starts) else len(source) + 1
+                )
+            type = types[code]
+            lexeme = source[start:end]
+            if type is NUMBER:
+                yield Token(type, lexeme, float(lexeme), line)
+            elif type is STRING:
+                yield Token(type, lexeme, lexeme[1:-1], line)
+            else:
+                yield Token(type, lexeme, None, line)
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> tuple[int, int, int]:
+        """Replace `deleted` characters at `offset` with `inserted`, in place.
+
+        Scanning restarts at the last token the edit cannot have changed and
+        stops at the first token past the edit that ends where an old token
+        ended: from there on the text, and so the scan, is the old one. The
+        tokens after it are kept with their offsets shifted. Errors are
+        recorded in `errors` but not reported.
+
+        Returns `(first, old_end, new_end)`: the tokens `[first, old_end)`
+        were replaced by the ones now at `[first, new_end)`.
+        """
+        old_source = self.source
+        source = old_source[:offset] + inserted + old_source[offset + deleted :]
+        delta = len(inserted) - deleted
+        edit_end = offset + len(inserted)
+        count = len(self.types) - 1
+        ends = self.ends
+        # a match looks at most two characters past its token (`1.` needs
+        # the character after the dot), so earlier tokens are unaffected
+        first = bisect_right(ends, offset - 2, 0, count)
+        restart = ends[first - 1] if first else 0
+
+        types = array("B")
+        starts = array("I")
+        new_ends = array("I")
+        errors = []
+        old_end = count
+        old_stop = len(old_source)
+        for code, start, end in scan_codes(source, restart, lazy=True):
+            if code is None:
+                errors.append((end, error_message(source, start)))
+                continue
+            types.append(code)
+            starts.append(start)
+            new_ends.append(end)
+            if end >= edit_end:
+                index = bisect_left(ends, end - delta, first, count)
+                if index < count and ends[index] == end - delta:
+                    old_end = index + 1
+                    old_stop = ends[index]
+                    break
+
+        self.types[first:old_end] = types
+        if delta:
+            starts.extend(map(delta.__add__, self.starts[old_end:]))
+            new_ends.extend(map(delta.__add__, ends[old_end:]))
+            self.starts[first:] = starts
+            self.ends[first:] = new_ends
         else:
-            return GREATER(line=line_idx)
-    elif char == "/":
-        if cur_idx + 1 < len(src_str) and src_str[cur_idx + 1] == "/":
-            return SLASH_SLASH(line=line_idx)
+            self.starts[first:old_end] = starts
+            self.ends[first:old_end] = new_ends
+        self.errors = (
+            [e for e in self.errors if e[0] <= restart]
+            + errors
+            + [(o + delta, m) for o, m in self.errors if o > old_stop]
+        )
+        self.has_error = bool(self.errors)
+
+        line_starts = self.line_starts
+        keep = bisect_right(line_starts, offset)
+        moved = bisect_right(line_starts, offset + deleted, keep)
+        added = array("I", [offset + i + 1 for i, c in enumerate(inserted) if c == "\n"])
+        if delta:
+            added.extend(map(delta.__add__, line_starts[moved:]))
+            line_starts[keep:] = added
         else:
-            return SLASH(line=line_idx)
-    elif char == " ":
-        return SPACE(line=line_idx)
-    elif char == "\t":
-        return TAB(line=line_idx)
-    elif char == "\n":
-        return NEWLINE(line=line_idx)
-    elif char == '"':
-        return parse_string(src_str, cur_idx, line_idx)
-    elif char.isdigit():
-        return parse_number(src_str, cur_idx, line_idx)
-    else:
-        if (reserved_word := matches_reserved_word(src_str, cur_idx, line_idx)):
-            return RESERVED_WORDS_MAP[reserved_word](line=line_idx) 
-        elif char.isalpha() or char == "_":
-            return parse_identifier(src_str, cur_idx, line_idx)
-        # print(f"Unexpected character: {char}", file=sys.stderr)
-        raise Exception(f"Unexpected character: {char}")
-
-def tokenize(file_contents: str) -> (list[Token], bool):
-    line_idx = 1
-    end_idx = len(file_contents)
-    has_error = False
-    tokens = []
-    char_idx = 0
-    while char_idx < end_idx:
-        try:
-            tok = next_token(file_contents, char_idx, line_idx)
-            if tok.type == TokenType.SLASH_SLASH:
-                while char_idx < end_idx and file_contents[char_idx] != "\n":
-                    char_idx += 1
-                continue
+            line_starts[keep:moved] = added
+        self.source = source
+        return first, old_end, first + len(types)
+
+    def lines(self):
+        """The `tokenize` command's output, one line per token, without Token objects."""
+        source = self.source
+        names = [type.name for type in TOKEN_TYPES]
+        NUMBER = TYPE_CODES[TokenType.NUMBER]
+        STRING = TYPE_CODES[TokenType.STRING]
+        for code, start, end in zip(self.types, self.starts, self.ends):
+            lexeme = source[start:end]
+            if code == NUMBER:
+                yield f"{names[code]} {lexeme} {float(lexeme)}"
+            elif code == STRING:
+                yield f"{names[code]} {lexeme} {lexeme[1:-1]}"
             else:
-                if tok.type not in [TokenType.SPACE, TokenType.TAB, TokenType.NEWLINE]:
-                    tokens.append(tok)
-                char_idx += len(tok)
-                if tok.type == TokenType.NEWLINE:
-                    line_idx += 1
-        except UnterminatedStringError as e:
-            print(e, file=sys.stderr)
-            print(f"[line {line_idx}] Error: Unterminated string.", file=sys.stderr)
-            has_error = True
-            # get to the next new line
-            while char_idx < end_idx and file_contents[char_idx] != "\n":
-                char_idx += 1
-        except Exception as e:
-            print(e, file=sys.stderr)
-            print(f"[line {line_idx}] Error: Unexpected character: {file_contents[char_idx]}", file=sys.stderr)
-            has_error = True
-            char_idx += 1
-    tokens.append(EOF(line=line_idx))
-    return tokens, has_error
\ No newline at end of file
+                yield f"{names[code]} {lexeme} null"
+
+
+RESERVED_CODES = {word: TYPE_CODES[type] for word, type in RESERVED_WORDS_MAP.items()}
+PUNCTUATION_CODES = {lexeme: TYPE_CODES[type] for lexeme, type in PUNCTUATION.items()}
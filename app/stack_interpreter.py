@@ -0,0 +1,181 @@
+from app.ast import (
+    Expr,
+    Stmt,
+    Literal,
+    Grouping,
+    Unary,
+    Binary,
+    Print,
+    Expression,
+    Variable,
+    VariableDeclaration,
+    Assignment,
+    Block,
+)
+from app.environment import Environment
+from app.interpreter import Interpreter
+from app.output import OutputSink
+from app.utils import stringify
+
+
+# Continuations on the work stack are `(kind, payload)` tuples; every other
+# item on it is an AST node that still has to be run.
+APPLY_BINARY = 0
+APPLY_BINARY_LEAF = 1
+APPLY_UNARY = 2
+ASSIGN = 3
+DEFINE = 4
+PRINT = 5
+DISCARD = 6
+EXIT_BLOCK = 7
+
+PRINT_VALUE = (PRINT, None)
+DISCARD_VALUE = (DISCARD, None)
+
+
+class StackInterpreter(Interpreter):
+    """Tree-walking interpreter that keeps its own stacks instead of recursing.
+
+    `work` holds the nodes still to run and the continuations waiting for
+    their results; `values` holds intermediate results. Python stack use is
+    constant however deep the tree is. Operators share `binaryOperation` and
+    `unaryOperation` with `Interpreter`, so results and errors are the same.
+
+    Execution is resumable: `start` loads a program and `step(limit)` runs at
+    most `limit` work items, returning True once the program has finished.
+    """
+
+    # called with the enclosing environment to make each block's scope
+    new_scope = Environment
+
+    def __init__(self, output: OutputSink = None):
+        super().__init__(output)
+        self.work: list = []
+        self.values: list = []
+        self.base_environment = self.environment
+
+    def interpret(self, stmts: list[Stmt]):
+        self.start(stmts)
+        self.step()
+
+    def evaluate(self, stmt: Stmt):
+        self.start([stmt])
+        self.step()
+        return self.values.pop() if self.values else None
+
+    def visit(self, expr: Expr):
+        return self.evaluate(expr)
+
+    def start(self, stmts: list[Stmt]) -> None:
+        self.work = [stmt for stmt in reversed(stmts) if stmt]
+        self.values = []
+        self.base_environment = self.environment
+
+    def step(self, limit: int = -1) -> bool:
+        """Run up to `limit` work items, or everything when `limit` is negative."""
+        work = self.work
+        values = self.values
+        push = work.append
+        pop = work.pop
+        push_value = values.append
+        try:
+            while work:
+                if limit == 0:
+                    return False
+                limit -= 1
+                item = pop()
+                # exact type checks: this loop runs once per node and continuation
+                kind = type(item)
+                if kind is tuple:
+                    op, node = item
+                    if op == APPLY_BINARY:
+                        right = values.pop()
+                        values[-1] = self.binaryOperation(node.operator.type, values[-1], right)
+                    elif op == APPLY_BINARY_LEAF:
+                        right = node.right
+                        if type(right) is Literal:
+                            right = right.value
+                        else:
+                            right = self.environment.get_at(right.depth, right.slot)
+                        values[-1] = self.binaryOperation(node.operator.type, values[-1], right)
+                    elif op == APPLY_UNARY:
+                        values[-1] = self.unaryOperation(node.operator.type, values[-1])
+                    elif op == ASSIGN:
+                        self.environment.assign_at(node.depth, node.slot, values[-1])
+                    elif op == DEFINE:
+                        self.environment.define(node.slot, values.pop())
+                    elif op == PRINT:
+                        self.output.write_line(stringify(values.pop()))
+                    elif op == DISCARD:
+                        values.pop()
+                    else:
+                        self.environment = node
+                elif kind is Literal:
+                    push_value(item.value)
+                elif kind is Binary:
+                    left = item.left
+                    right = item.right
+                    left_kind = type(left)
+                    right_kind = type(right)
+                    if (left_kind is Literal or left_kind is Variable) and (
+                        right_kind is Literal or right_kind is Variable
+                    ):
+                        # two leaves: nothing can run in between, so apply directly
+                        environment = self.environment
+                        push_value(
+                            self.binaryOperation(
+                                item.operator.type,
+                                left.value
+                                if left_kind is Literal
+                                else environment.get_at(left.depth, left.slot),
+                                right.value
+                                if right_kind is Literal
+                                else environment.get_at(right.depth, right.slot),
+                            )
+                        )
+                    elif right_kind is Literal or right_kind is Variable:
+                        # the leaf is read once the left operand is done
+                        push((APPLY_BINARY_LEAF, item))
+                        push(left)
+                    else:
+                        push((APPLY_BINARY, item))
+                        push(right)
+                        push(left)
+                elif kind is Variable:
+                    push_value(self.environment.get_at(item.depth, item.slot))
+                elif kind is Grouping:
+                    push(item.expr)
+                elif kind is Unary:
+                    push((APPLY_UNARY, item))
+                    push(item.right)
+                elif kind is Assignment:
+                    push((ASSIGN, item))
+                    push(item.value)
+                elif kind is Print:
+                    push(PRINT_VALUE)
+                    push(item.expr)
+                elif kind is Expression:
+                    push(DISCARD_VALUE)
+                    push(item.expr)
+                elif kind is VariableDeclaration:
+                    if item.initializer is None:
+                        self.environment.define(item.slot, None)
+                    else:
+                        push((DEFINE, item))
+                        push(item.initializer)
+                elif kind is Block:
+                    push((EXIT_BLOCK, self.environment))
+                    self.environment = self.new_scope(self.environment)
+                    work.extend(reversed(item.statements))
+                else:
+                    raise ValueError(f"Unexpected node type: {kind}")
+        except BaseException:
+            self.stop()
+            raise
+        return True
+
+    def stop(self) -> None:
+        """Abandon the running program, like the recursive evaluator unwinding its blocks."""
+        self.environment = self.base_environment
+        self.work.clear()
+        self.values.clear()
@@ -1,7 +1,20 @@
 from typing import Any
 
+from app.rope import Rope
+
 
 def stringify(val: Any):
+    # fast paths for the values programs print most; same output as below
+    val_type = type(val)
+    if val_type is float:
+        str_val = repr(val)
+        return str_val[:-2] if str_val.endswith(".0") else str_val
+    if val_type is str:
+        return val
+    if val_type is Rope:
+        return str(val)
+    if val_type is bool:
+        return "true" if val else "false"
     if val is None:
         return "nil"
     if isinstance(val, bool):
@@ -18,3 +31,17 @@ def stringify(val: Any):
         return str_val
     else:
         return str(val)
+
+
+def is_truthy(val: Any) -> bool:
+    if val is None:
+        return False
+    if isinstance(val, bool):
+        return val
+    return True
+
+
+def is_equal(left: Any, right: Any) -> bool:
+    if left is None:
+        return right is None
+    return left == right
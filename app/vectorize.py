@@ -0,0 +1,381 @@
+import csv
+import sys
+import zipfile
+from typing import Any
+
+from app.ast import Expr, Literal, Grouping, Unary, Binary, Variable, Assignment
+from app.output import OutputSink
+from app.scanner import TokenType
+from app.utils import stringify
+
+
+# value tags; bools also keep 0.0/1.0 in `numbers`
+NIL = 0
+BOOL = 1
+NUMBER = 2
+STRING = 3
+
+# per-row error codes; 0 means the row evaluated cleanly
+ERROR_MESSAGES = {
+    1: "Operand must be a number",
+    2: "Operands must be numbers",
+    3: "+ operator should be either numbers or strings",
+    4: "Division by zero.",
+}
+OPERAND_NOT_NUMBER = 1
+OPERANDS_NOT_NUMBERS = 2
+BAD_PLUS_OPERANDS = 3
+DIVISION_BY_ZERO = 4
+
+
+class VectorizeError(Exception):
+    def __init__(self, m):
+        self.message = m
+
+    def __str__(self):
+        return self.message
+
+
+def require_numpy():
+    # NumPy is only needed for `evaluate --bindings`, so it is imported lazily
+    try:
+        import numpy
+    except ImportError:
+        raise VectorizeError(
+            "Vectorized evaluation (--bindings) requires NumPy: pip install numpy"
+        )
+    return numpy
+
+
+class Column:
+    """A tagged column of Lox values, one row per binding.
+
+    `tags` holds NIL/BOOL/NUMBER/STRING per row, `numbers` the float value of
+    number and bool rows, and `strings` (an object array, or None when no
+    row is a string) the value of string rows.
+    """
+
+    __slots__ = ("tags", "numbers", "strings")
+
+    def __init__(self, tags, numbers, strings=None):
+        self.tags = tags
+        self.numbers = numbers
+        self.strings = strings
+
+    def value(self, row: int) -> Any:
+        tag = self.tags[row]
+        if tag == NUMBER:
+            return float(self.numbers[row])
+        if tag == BOOL:
+            return bool(self.numbers[row])
+        if tag == STRING:
+            return self.strings[row]
+        return None
+
+
+def column_from_values(np, values: list[Any]) -> Column:
+    """Build a column from Python values as the interpreter would see them."""
+    rows = len(values)
+    tags = np.empty(rows, dtype=np.int8)
+    numbers = np.zeros(rows, dtype=np.float64)
+    strings = None
+    for row, value in enumerate(values):
+        if value is None:
+            tags[row] = NIL
+        elif isinstance(value, (bool, np.bool_)):
+            tags[row] = BOOL
+            numbers[row] = float(value)
+        elif isinstance(value, (int, float, np.integer, np.floating)):
+            tags[row] = NUMBER
+            numbers[row] = float(value)
+        else:
+            if strings is None:
+                strings = np.full(rows, None, dtype=object)
+            tags[row] = STRING
+            strings[row] = str(value)
+    return Column(tags, numbers, strings)
+
+
+def column_from_array(np, array) -> Column:
+    rows = len(array)
+    if array.dtype == np.bool_:
+        return Column(np.full(rows, BOOL, dtype=np.int8), array.astype(np.float64))
+    if array.dtype.kind in "iuf":
+        return Column(np.full(rows, NUMBER, dtype=np.int8), array.astype(np.float64))
+    return column_from_values(np, array.tolist())
+
+
+def parse_cell(cell: str) -> Any:
+    """CSV cells: numbers, `true`/`false`, `nil` or empty, anything else a string."""
+    if cell == "" or cell == "nil":
+        return None
+    if cell == "true":
+        return True
+    if cell == "false":
+        return False
+    try:
+        return float(cell)
+    except ValueError:
+        return cell
+
+
+def column_from_cells(np, cells: list[str]) -> Column:
+    try:
+        # fast path: an all-numeric column converts in one C call
+        numbers = np.array(cells, dtype=np.float64)
+    except ValueError:
+        return column_from_values(np, [parse_cell(cell) for cell in cells])
+    return Column(np.full(len(cells), NUMBER, dtype=np.int8), numbers)
+
+
+def file_error(path: str, e: Exception) -> VectorizeError:
+    reason = e.strerror if isinstance(e, OSError) and e.strerror else str(e)
+    return VectorizeError(f"{path}: {reason}")
+
+
+def load_bindings(path: str) -> (dict[str, Column], int):
+    """Read named columns from a `.csv` (header row), `.npz` or structured `.npy`.
+
+    A missing, unreadable or malformed file raises `VectorizeError`.
+    """
+    try:
+        return read_bindings(path)
+    except (OSError, ValueError, EOFError, csv.Error, zipfile.BadZipFile) as e:
+        raise file_error(path, e)
+
+
+def read_bindings(path: str) -> (dict[str, Column], int):
+    np = require_numpy()
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+    elif path.endswith(".npy"):
+        array = np.load(path, allow_pickle=False)
+        if array.dtype.names is None:
+            raise VectorizeError(f"{path}: .npy bindings must be a structured array")
+        arrays = {name: array[name] for name in array.dtype.names}
+    else:
+        with open(path, newline="") as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                raise VectorizeError(f"{path}: missing header row")
+            cells = [[] for _ in header]
+            for record in reader:
+                for index, cell in enumerate(record[: len(header)]):
+                    cells[index].append(cell)
+                for index in range(len(record), len(header)):
+                    cells[index].append("")
+        columns = {
+            name.strip(): column_from_cells(np, cells[index])
+            for index, name in enumerate(header)
+        }
+        return columns, len(cells[0]) if cells else 0
+
+    rows = {len(array) for array in arrays.values()}
+    if len(rows) > 1:
+        raise VectorizeError(f"{path}: columns have different lengths")
+    columns = {name: column_from_array(np, array) for name, array in arrays.items()}
+    return columns, rows.pop() if rows else 0
+
+
+class VectorEvaluator:
+    """Evaluates one expression over every row of a set of bound columns at once.
+
+    Each node becomes a handful of NumPy operations on whole columns. A row
+    that hits a Lox runtime error gets an error code in `errors` (the first
+    error in evaluation order wins) and carries nil from then on, so it
+    cannot raise a second error; the other rows are unaffected.
+    """
+
+    def __init__(self, columns: dict[str, Column], rows: int):
+        self.np = require_numpy()
+        self.columns = columns
+        self.rows = rows
+        self.errors = self.np.zeros(rows, dtype=self.np.int8)
+
+    def evaluate(self, expr: Expr) -> Column:
+        # failed rows still go through the arithmetic (a division by zero
+        # leaves an inf behind, say); their results are masked out, so
+        # NumPy's warnings about them are noise
+        with self.np.errstate(all="ignore"):
+            return self.visit(expr)
+
+    def visit(self, expr: Expr) -> Column:
+        if isinstance(expr, Literal):
+            return self.visitLiteralExpression(expr)
+        elif isinstance(expr, Grouping):
+            return self.visit(expr.expr)
+        elif isinstance(expr, Unary):
+            return self.visitUnaryExpression(expr)
+        elif isinstance(expr, Binary):
+            return self.visitBinaryExpression(expr)
+        elif isinstance(expr, Variable):
+            return self.visitVariableExpression(expr)
+        elif isinstance(expr, Assignment):
+            raise VectorizeError("Assignment is not supported in vectorized evaluation.")
+        else:
+            raise ValueError(f"Unexpected expression type: {type(expr)}")
+
+    def fail(self, mask, code: int) -> None:
+        self.errors[mask & (self.errors == 0)] = code
+
+    def constant(self, tag: int, number: float = 0.0, string: str = None) -> Column:
+        np = self.np
+        strings = np.full(self.rows, string, dtype=object) if string is not None else None
+        return Column(
+            np.full(self.rows, tag, dtype=np.int8),
+            np.full(self.rows, number, dtype=np.float64),
+            strings,
+        )
+
+    def result(self, tag: int, numbers, failed=None) -> Column:
+        tags = self.np.full(self.rows, tag, dtype=self.np.int8)
+        if failed is not None:
+            tags[failed] = NIL
+        return Column(tags, numbers)
+
+    def visitLiteralExpression(self, expr: Literal) -> Column:
+        value = expr.value
+        if value is None:
+            return self.constant(NIL)
+        if isinstance(value, bool):
+            return self.constant(BOOL, float(value))
+        if isinstance(value, float):
+            return self.constant(NUMBER, value)
+        return self.constant(STRING, string=str(value))
+
+    def visitVariableExpression(self, expr: Variable) -> Column:
+        column = self.columns.get(expr.name.lexeme)
+        if column is None:
+            raise VectorizeError(f"Undefined variable '{expr.name.lexeme}'.")
+        return column
+
+    def truthy(self, column: Column):
+        return ~((column.tags == NIL) | ((column.tags == BOOL) & (column.numbers == 0)))
+
+    def visitUnaryExpression(self, expr: Unary) -> Column:
+        right = self.visit(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+            failed = right.tags != NUMBER
+            self.fail(failed, OPERAND_NOT_NUMBER)
+            return self.result(NUMBER, -right.numbers, failed)
+        elif expr.operator.type == TokenType.BANG:
+            return self.result(BOOL, (~self.truthy(right)).astype(self.np.float64))
+        return self.constant(NIL)
+
+    def equal(self, left: Column, right: Column):
+        np = self.np
+        # bools are ints in the interpreter, so `true == 1` holds there too
+        numeric = np.isin(left.tags, (BOOL, NUMBER)) & np.isin(right.tags, (BOOL, NUMBER))
+        same = ((left.tags == NIL) & (right.tags == NIL)) | (
+            numeric & (left.numbers == right.numbers)
+        )
+        if left.strings is not None and right.strings is not None:
+            strings = (left.tags == STRING) & (right.tags == STRING)
+            same[strings] = left.strings[strings] == right.strings[strings]
+        return same
+
+    def visitBinaryExpression(self, expr: Binary) -> Column:
+        np = self.np
+        left = self.visit(expr.left)
+        right = self.visit(expr.right)
+        operator_type = expr.operator.type
+
+        if operator_type == TokenType.EQUAL_EQUAL:
+            return self.result(BOOL, self.equal(left, right).astype(np.float64))
+        if operator_type == TokenType.BANG_EQUAL:
+            return self.result(BOOL, (~self.equal(left, right)).astype(np.float64))
+
+        if operator_type == TokenType.PLUS:
+            # the interpreter adds any two numbers or bools (bool is an int)
+            numeric = np.isin(left.tags, (BOOL, NUMBER)) & np.isin(right.tags, (BOOL, NUMBER))
+            strings = (left.tags == STRING) & (right.tags == STRING)
+            failed = ~(numeric | strings)
+            self.fail(failed, BAD_PLUS_OPERANDS)
+            column = self.result(NUMBER, left.numbers + right.numbers, failed)
+            if strings.any():
+                column.tags[strings] = STRING
+                column.strings = np.full(self.rows, None, dtype=object)
+                column.strings[strings] = left.strings[strings] + right.strings[strings]
+            return column
+
+        failed = (left.tags != NUMBER) | (right.tags != NUMBER)
+        self.fail(failed, OPERANDS_NOT_NUMBERS)
+        if operator_type == TokenType.MINUS:
+            return self.result(NUMBER, left.numbers - right.numbers, failed)
+        elif operator_type == TokenType.STAR:
+            return self.result(NUMBER, left.numbers * right.numbers, failed)
+        elif operator_type == TokenType.SLASH:
+            # Python raises on x / 0.0; here it fails just that row
+            by_zero = ~failed & (right.numbers == 0)
+            self.fail(by_zero, DIVISION_BY_ZERO)
+            return self.result(NUMBER, left.numbers / right.numbers, failed | by_zero)
+        elif operator_type == TokenType.GREATER:
+            return self.result(BOOL, (left.numbers > right.numbers).astype(np.float64), failed)
+        elif operator_type == TokenType.GREATER_EQUAL:
+            return self.result(BOOL, (left.numbers >= right.numbers).astype(np.float64), failed)
+        elif operator_type == TokenType.LESS:
+            return self.result(BOOL, (left.numbers < right.numbers).astype(np.float64), failed)
+        elif operator_type == TokenType.LESS_EQUAL:
+            return self.result(BOOL, (left.numbers <= right.numbers).astype(np.float64), failed)
+        return self.constant(NIL)
+
+
+def write_results(
+    result: Column, errors, output_path: str = None, output: OutputSink = None
+) -> None:
+    """Write `result,error` rows as CSV, or `result`/`error` arrays to a `.npz`.
+
+    Failed rows have an empty result and the error message; in a `.npz` the
+    `error` array is the per-row error mask.
+    """
+    np = require_numpy()
+    failed = errors != 0
+    if output_path is not None and output_path.endswith(".npz"):
+        if np.all((result.tags == NUMBER) | failed):
+            values = np.where(failed, np.nan, result.numbers)
+        else:
+            values = np.array(
+                ["" if failed[row] else stringify(result.value(row)) for row in range(len(errors))],
+                dtype=str,
+            )
+        np.savez(output_path, result=values, error=failed, error_code=errors)
+        return
+
+    lines = ["result,error"]
+    for row in range(len(errors)):
+        code = errors[row]
+        if code:
+            lines.append(f",{ERROR_MESSAGES[code]}")
+        else:
+            lines.append(csv_field(stringify(result.value(row))) + ",")
+    if output_path is not None:
+        with open(output_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+    else:
+        for line in lines:
+            output.write_line(line)
+
+
+def csv_field(value: str) -> str:
+    if any(c in value for c in ',"\n\r'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def evaluate_bindings(expr: Expr, options: dict[str, Any], output: OutputSink) -> int:
+    """`evaluate --bindings=FILE [--output=FILE]`: evaluate `expr` once per row."""
+    columns, rows = load_bindings(options["bindings"])
+    evaluator = VectorEvaluator(columns, rows)
+    result = evaluator.evaluate(expr)
+    errors = evaluator.errors
+    output_path = options.get("output") or None
+    try:
+        write_results(result, errors, output_path, output)
+    except OSError as e:
+        raise file_error(output_path, e)
+    failed = int((errors != 0).sum())
+    if failed:
+        print(f"{failed} of {rows} rows failed", file=sys.stderr)
+    return 0
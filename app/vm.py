@@ -0,0 +1,165 @@
+import sys
+from typing import Any
+from app.compiler import Chunk, OpCode
+from app.interpreter import EvaluationError
+from app.output import OutputSink, StreamSink
+from app.utils import stringify, is_truthy, is_equal
+from app.rope import STRING_TYPES, concat
+
+
+CONSTANT = OpCode.CONSTANT.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+POP = OpCode.POP.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+PRINT = OpCode.PRINT.value
+POPN = OpCode.POPN.value
+RETURN = OpCode.RETURN.value
+
+
+class VM:
+    """Stack machine executing a `Chunk` produced by `Compiler`.
+
+    Operator semantics and error messages match `Interpreter`, so both
+    engines produce the same output for the same program.
+    """
+
+    def __init__(self, output: OutputSink = None):
+        self.output = output if output is not None else StreamSink()
+        self.globals: dict[str, Any] = {}
+        self.stack: list[Any] = []
+
+    def undefined(self, name: str, line: int):
+        msg = f"Undefined variable '{name}'."
+        print(msg, file=sys.stderr)
+        print(f"[line {line}]", file=sys.stderr)
+        return RuntimeError(msg)
+
+    def run(self, chunk: Chunk):
+        code = chunk.code
+        constants = chunk.constants
+        lines = chunk.lines
+        globals = self.globals
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        write_line = self.output.write_line
+        ip = 0
+        while True:
+            op = code[ip]
+            ip += 1
+            if op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == GET_LOCAL:
+                push(stack[code[ip]])
+                ip += 1
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in globals:
+                    raise self.undefined(name, lines[ip])
+                push(globals[name])
+                ip += 1
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if isinstance(left, (float, int, complex)) and isinstance(
+                    right, (float, int, complex)
+                ):
+                    stack[-1] = float(left) + float(right)
+                elif isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+                    stack[-1] = concat(left, right)
+                else:
+                    raise EvaluationError(
+                        f"+ operator should be either numbers or strings, but encountered {left} and {right}"
+                    )
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    raise EvaluationError(f"Operands must be numbers")
+                stack[-1] = left - right
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    raise EvaluationError(f"Operands must be numbers")
+                stack[-1] = left * right
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    raise EvaluationError(f"Operands must be numbers")
+                stack[-1] = left / right
+            elif op == SET_LOCAL:
+                stack[code[ip]] = stack[-1]
+                ip += 1
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in globals:
+                    raise self.undefined(name, lines[ip])
+                globals[name] = stack[-1]
+                ip += 1
+            elif op == POP:
+                pop()
+            elif op == PRINT:
+                write_line(stringify(pop()))
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == NEGATE:
+                right = stack[-1]
+                if not isinstance(right, float):
+                    raise EvaluationError(f"Operand must be a number")
+                stack[-1] = -1 * right
+            elif op == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = is_equal(stack[-1], right)
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not is_equal(stack[-1], right)
+            elif op in (GREATER, GREATER_EQUAL, LESS, LESS_EQUAL):
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    raise EvaluationError(f"Operands must be numbers")
+                if op == GREATER:
+                    stack[-1] = left > right
+                elif op == GREATER_EQUAL:
+                    stack[-1] = left >= right
+                elif op == LESS:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = left <= right
+            elif op == POPN:
+                del stack[len(stack) - code[ip] :]
+                ip += 1
+            elif op == RETURN:
+                return None
+            else:
+                raise ValueError(f"Unknown opcode: {op}")
@@ -0,0 +1,9 @@
+"""Usage: python -m benchmarks [workload ...] [--scale=1.0] [--repeat=3]
+    [--engine=tree|vm|closure|stack|all] [--output=results.json]
+    [--compare=baseline.json] [--threshold=0.1]
+"""
+import sys
+
+from benchmarks.runner import main
+
+sys.exit(main(sys.argv[1:]))
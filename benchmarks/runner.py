@@ -0,0 +1,162 @@
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable
+
+from app.scanner import TokenArray, TokenStream
+from app.parser import Parser
+from app.resolver import Resolver
+from app.main import execute, ENGINES
+from app.output import MemorySink
+from benchmarks.workloads import WORKLOADS, EXPRESSION_WORKLOADS
+
+# default size of each workload at --scale=1
+BASE_SIZES = {
+    "deep_expressions": 500,
+    "many_variables": 5000,
+    "nested_blocks": 100,
+    "string_concatenation": 5000,
+    "arithmetic_expression": 5000,
+}
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> (float, Any):
+    """Run `fn` `repeat` times; return the median wall time and last result."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def count_streamed(source: str) -> int:
+    return sum(1 for _ in TokenStream(io.StringIO(source)))
+
+
+def bench_scanners(source: str, repeat: int) -> dict[str, float]:
+    """Time the scanners the CLI uses.
+
+    `TokenArray` is used by run, parse, evaluate and the REPL. `TokenStream`
+    is used by `tokenize` on a file.
+    """
+    timings = {}
+    timings["tokenize"], tokens = measure(lambda: TokenArray(source), repeat)
+    timings["tokens"] = len(tokens)
+    timings["tokenize.stream"], _ = measure(lambda: count_streamed(source), repeat)
+    return timings
+
+
+def bench_statements(source: str, engines: list[str], repeat: int) -> dict[str, float]:
+    timings = {"chars": len(source)}
+    timings.update(bench_scanners(source, repeat))
+    tokens = TokenArray(source)
+    timings["parse"], stmts = measure(lambda: Parser(tokens).parse_statements(), repeat)
+    # resolving is idempotent, so repeated runs over the same tree are fine
+    timings["resolve"], _ = measure(lambda: Resolver().resolve(stmts), repeat)
+    for engine in engines:
+        timings[f"interpret.{engine}"], _ = measure(
+            lambda: execute(stmts, engine, MemorySink()), repeat
+        )
+    return timings
+
+
+def bench_expressions(source: str, repeat: int) -> dict[str, float]:
+    timings = {"chars": len(source)}
+    timings.update(bench_scanners(source, repeat))
+    tokens = TokenArray(source)
+    timings["parse"], _ = measure(lambda: Parser(tokens).parse_expressions(), repeat)
+    return timings
+
+
+def run_benchmarks(scale: float, repeat: int, engines: list[str], only: list[str] = None) -> dict:
+    results = {}
+    for name, generate in {**WORKLOADS, **EXPRESSION_WORKLOADS}.items():
+        if only and name not in only:
+            continue
+        source = generate(max(1, int(BASE_SIZES[name] * scale)))
+        if name in EXPRESSION_WORKLOADS:
+            results[name] = bench_expressions(source, repeat)
+        else:
+            results[name] = bench_statements(source, engines, repeat)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "repeat": repeat,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return one line per timing that got slower than `threshold` (0.1 = 10%)."""
+    regressions = []
+    for workload, timings in current["results"].items():
+        before = baseline.get("results", {}).get(workload)
+        if before is None:
+            continue
+        for phase, seconds in timings.items():
+            if phase in ("chars", "tokens") or phase not in before:
+                continue
+            if before[phase] > 0 and seconds > before[phase] * (1 + threshold):
+                change = (seconds / before[phase] - 1) * 100
+                regressions.append(
+                    f"{workload} {phase}: {before[phase]:.4f}s -> {seconds:.4f}s (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def format_results(report: dict) -> list[str]:
+    lines = []
+    for workload, timings in report["results"].items():
+        lines.append(f"{workload} ({timings['chars']} chars, {timings['tokens']} tokens)")
+        for phase, seconds in timings.items():
+            if phase in ("chars", "tokens"):
+                continue
+            lines.append(f"  {phase:<20} {seconds * 1000:10.2f} ms")
+    return lines
+
+
+def main(argv: list[str]) -> int:
+    from app.main import parse_options
+
+    args, options = parse_options(argv)
+    scale = float(options.get("scale", 1.0))
+    repeat = int(options.get("repeat", 3))
+    engine = options.get("engine", "tree")
+    engines = list(ENGINES) if engine == "all" else engine.split(",")
+    for name in engines:
+        if name not in ENGINES:
+            print(f"Unknown engine: {name}", file=sys.stderr)
+            return 1
+
+    # deep_expressions and nested_blocks recurse through the parser and
+    # tree-walker once per nesting level
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    report = run_benchmarks(scale, repeat, engines, args or None)
+    for line in format_results(report):
+        print(line)
+
+    if options.get("output"):
+        with open(options["output"], "w") as file:
+            json.dump(report, file, indent=2)
+
+    if options.get("compare"):
+        with open(options["compare"]) as file:
+            baseline = json.load(file)
+        threshold = float(options.get("threshold", 0.1))
+        regressions = compare(baseline, report, threshold)
+        if regressions:
+            print(f"Regressions over {threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"No regressions over {threshold:.0%}.")
+    return 0
@@ -0,0 +1,68 @@
+"""Synthetic Lox programs whose size scales with `size`.
+
+Each generator returns source text. Statement workloads are parsed with
+`Parser.parse_statements`; expression workloads (`EXPRESSION_WORKLOADS`)
+with `Parser.parse_expressions` and are not interpreted.
+"""
+
+
+def deep_expressions(size: int, depth: int = 40) -> str:
+    """`size` print statements, each a parenthesized expression `depth` deep."""
+    lines = []
+    for i in range(size):
+        expr = f"{i}"
+        for d in range(depth):
+            op = "+-*"[d % 3]
+            expr = f"({expr} {op} {d % 7 + 1})"
+        lines.append(f"print {expr};")
+    return "\n".join(lines) + "\n"
+
+
+def many_variables(size: int) -> str:
+    """`size` global declarations, each reading the two before it."""
+    lines = ["var v0 = 1;", "var v1 = 2;"]
+    for i in range(2, size):
+        lines.append(f"var v{i} = v{i - 1} * 0.5 + v{i - 2} - {i};")
+    lines.append(f"print v{size - 1};")
+    return "\n".join(lines) + "\n"
+
+
+def nested_blocks(size: int, depth: int = 30) -> str:
+    """`size` towers of blocks `depth` deep, assigning to outer variables."""
+    lines = ["var total = 0;"]
+    for i in range(size):
+        for d in range(depth):
+            lines.append("  " * d + "{")
+            lines.append("  " * d + f" var b{d} = {d};")
+            lines.append("  " * d + f" total = total + b{d};")
+        for d in reversed(range(depth)):
+            lines.append("  " * d + "}")
+    lines.append("print total;")
+    return "\n".join(lines) + "\n"
+
+
+def string_concatenation(size: int) -> str:
+    """A string grown one piece at a time, `size` times."""
+    lines = ['var s = "";']
+    for i in range(size):
+        lines.append(f's = s + "chunk{i % 10}";')
+    lines.append("print s;")
+    return "\n".join(lines) + "\n"
+
+
+def arithmetic_expression(size: int) -> str:
+    """One long flat expression for `parse_expressions`."""
+    terms = [f"{i % 97} * {i % 13 + 1}" for i in range(size)]
+    return " + ".join(terms) + "\n"
+
+
+WORKLOADS = {
+    "deep_expressions": deep_expressions,
+    "many_variables": many_variables,
+    "nested_blocks": nested_blocks,
+    "string_concatenation": string_concatenation,
+}
+
+EXPRESSION_WORKLOADS = {
+    "arithmetic_expression": arithmetic_expression,
+}
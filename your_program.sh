@@ -12,4 +12,10 @@ set -e # Exit early if any commands fail
 #
 # - Edit this to change how your program runs locally
 # - Edit .codecrafters/run.sh to change how your program runs remotely
+#
+# With LOX_DAEMON_SOCKET set, scripts are sent to a daemon started with
+# `./your_program.sh serve <socket-path>` (falls back to app.main if it is not running).
+if [ -n "$LOX_DAEMON_SOCKET" ]; then
+  exec pipenv run python3 -m app.client "$@"
+fi
 exec pipenv run python3 -m app.main "$@"